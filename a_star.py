@@ -1,9 +1,18 @@
+import functools
 import heapq
+import tracemalloc
+from time import perf_counter
 
+# nodes keep the action that produced them and a parent pointer, the state is only
+# held while it is needed: A* releases it once the node is expanded and replays the
+# actions to rebuild the solution path (SMA* drops it on queued nodes instead)
 class Node:
-    def __init__(self, state, parent=None, g=0, h=0):
+    __slots__ = ('state', 'parent', 'action', 'g', 'h', 'f')
+
+    def __init__(self, state, parent=None, g=0, h=0, action=None):
         self.state = state
         self.parent = parent
+        self.action = action
         self.g = g
         self.h = h
         self.f = g + h
@@ -11,76 +20,233 @@ class Node:
     def __lt__(self, other): # for priority queue by f value
         return self.f < other.f
 
-def child_node(problem, parent_node, action, heuristic):
+def child_node(problem, parent_node, action, heuristic, node_cls=Node):
     new_state = problem.apply_action(parent_node.state, action)
+    if new_state is None: # problem pruned a dead end
+        return None
     g = parent_node.g + 1
-    h = heuristic(new_state)
-    return Node(new_state, parent_node, g, h)
+    # heuristics may provide an incremental form computed from the parent node
+    incremental = getattr(heuristic, 'incremental', None)
+    h = incremental(parent_node, action, new_state) if incremental else heuristic(new_state)
+    return node_cls(new_state, parent_node, g, h, action)
+
+# rebuilds the state of a queued node from its expanded parent
+def materialize(problem, node):
+    if node.state is None:
+        node.state = problem.apply_action(node.parent.state, node.action)
+    return node.state
+
+# search strategies: plain A* orders the open set on f alone; on Sudoku every node
+# has the same f, so the others break that tie or change the priority:
+#   tie_g / tie_h  f, then deeper (larger g) / closer (lower h) nodes first
+#   weighted       g + weight*h, inflating h trades optimality for speed
+#   greedy         h alone (greedy best-first)
+#   beam           layer by layer, keeping the beam_width best nodes per layer
+STRATEGIES = ('astar', 'tie_g', 'tie_h', 'weighted', 'greedy', 'beam')
+
+# heap priority of a strategy, None keeps the plain A* ordering of Node.__lt__
+def priority_key(strategy, weight=2.0):
+    if strategy == 'astar':
+        return None
+    if strategy == 'tie_g':
+        return lambda node: (node.f, -node.g)
+    if strategy == 'tie_h':
+        return lambda node: (node.f, node.h)
+    if strategy == 'weighted':
+        return lambda node: (node.g + weight * node.h, node.h)
+    if strategy == 'greedy':
+        return lambda node: (node.h, -node.g)
+    raise ValueError(f"unknown search strategy: {strategy}")
 
 # allows modular use of A* with different problems and heuristics
-def a_star(problem, heuristic, verbose=False, iteration_limit=500000):
+# stats: optional instrumentation.SearchStats collecting time per operation
+# time_limit (seconds) and max_memory (bytes traced by tracemalloc) stop the search
+# like iteration_limit does, metrics['status'] tells which limit was hit
+# strategy: one of STRATEGIES, weight is used by 'weighted', beam_width by 'beam'
+def a_star(problem, heuristic, verbose=False, iteration_limit=500000, track_memory=False, stats=None,
+           time_limit=None, max_memory=None, strategy='astar', weight=2.0, beam_width=100):
+    if strategy == 'beam':
+        search = functools.partial(_beam_search, beam_width=beam_width)
+    else:
+        search = functools.partial(_a_star, key=priority_key(strategy, weight))
+    return traced(functools.partial(search, problem, heuristic, verbose, stats,
+                                    limit_checker(iteration_limit, time_limit, max_memory)),
+                  track_memory, max_memory)
+
+# runs search() with tracemalloc on when memory is tracked or bounded, the peak
+# traced memory of the search is reported with the other metrics
+def traced(search, track_memory=False, max_memory=None):
+    if not track_memory and max_memory is None:
+        return search()
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        path, metrics = search()
+        metrics['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        if started:
+            tracemalloc.stop()
+    return path, metrics
+
+# the clock and the traced memory are only read every few expansions
+TIME_CHECK_EVERY = 256
+MEMORY_CHECK_EVERY = 1024
+
+# budgets shared by every search: the returned check is called before each expansion
+# with the number of expansions so far and gives the status of the limit that was
+# hit, or None. max_memory needs tracemalloc running (see traced)
+def limit_checker(iteration_limit, time_limit=None, max_memory=None):
+    deadline = perf_counter() + time_limit if time_limit is not None else None
+
+    def check(expanded):
+        if expanded >= iteration_limit:
+            print(" - Iteration limit reached, stopping search.")
+            return 'iteration_limit'
+        if deadline is not None and expanded % TIME_CHECK_EVERY == 0 and perf_counter() > deadline:
+            print(" - Time limit reached, stopping search.")
+            return 'time_limit'
+        if max_memory is not None and expanded % MEMORY_CHECK_EVERY == 0 and tracemalloc.get_traced_memory()[0] > max_memory:
+            print(" - Memory limit reached, stopping search.")
+            return 'memory_limit'
+        return None
+    return check
+
+# metrics every search returns, extra counters go before the status
+def search_metrics(status, nodes_generated, nodes_expanded, max_frontier_size, **extra):
+    return {
+        'nodes_generated': nodes_generated,
+        'nodes_expanded': nodes_expanded,
+        'max_frontier_size': max_frontier_size,
+        **extra,
+        'status': status
+    }
+
+def _instrumented(problem, heuristic, stats):
+    from instrumentation import TimedProblem, timed_heuristic
+    return TimedProblem(problem, stats), timed_heuristic(heuristic, stats)
+
+# limit_status: check made by limit_checker
+# key: priority_key of the strategy; with a key the heap holds (priority, seq, node)
+# entries, seq keeps equal priorities in insertion order
+def _a_star(problem, heuristic, verbose, stats, limit_status, key=None):
+    push, pop = heapq.heappush, heapq.heappop
+    if stats is not None:
+        problem, heuristic = _instrumented(problem, heuristic, stats)
+        push, pop = stats.timed('heap', push), stats.timed('heap', pop)
+
     start_node = Node(problem.initial_state, g=0, h=heuristic(problem.initial_state))
     frontier = []
-    heapq.heappush(frontier, start_node)
+    seq = 0
+    push(frontier, start_node if key is None else (key(start_node), seq, start_node))
+    # open set index: state key -> best g currently queued, heap entries whose
+    # g no longer matches are stale and get skipped when popped (lazy deletion)
+    frontier_g = {problem.state_to_hashable(start_node.state): 0}
     explored = set()
+    # problems may test the goal from the node (e.g. from g) instead of rescanning the state
+    is_goal_node = getattr(problem, 'is_goal_node', None)
 
     nodes_generated = 1  # starting node
     nodes_expanded = 0
     max_frontier_size = 1
-    i = 0
+
     while frontier:
-        if i >= iteration_limit:
-            print(" - Iteration limit reached, stopping search.")
-            return None, {
-                    'nodes_generated': nodes_generated,
-                    'nodes_expanded': nodes_expanded,
-                    'max_frontier_size': max_frontier_size
-                }
-
-        i+=1
-        node = heapq.heappop(frontier)
+        status = limit_status(nodes_expanded)
+        if status:
+            return None, search_metrics(status, nodes_generated, nodes_expanded, max_frontier_size)
+
+        node = pop(frontier)
+        if key is not None:
+            node = node[2]
+        node_hash = problem.state_to_hashable(node.state)
+        if frontier_g.get(node_hash) != node.g:
+            node.state = None
+            continue  # stale entry, a cheaper path was queued or it was already expanded
+        del frontier_g[node_hash]
+
         nodes_expanded += 1
 
-        if problem.is_goal(node.state):
+        if is_goal_node(node) if is_goal_node else problem.is_goal(node.state):
             # metrics
-            return reconstruct_path(node), {
-                'nodes_generated': nodes_generated,
-                'nodes_expanded': nodes_expanded,
-                'max_frontier_size': max_frontier_size
-            }
+            return list(replay_path(problem, path_actions(node))), search_metrics('solved', nodes_generated, nodes_expanded, max_frontier_size)
 
-        explored.add(problem.state_to_hashable(node.state))
+        explored.add(node_hash)
 
         # expand node by applying all possible actions
         actions = problem.get_actions(node.state)
         for action in actions:
             child = child_node(problem, node, action, heuristic)
+            if child is None:
+                continue
             nodes_generated += 1
             child_hash = problem.state_to_hashable(child.state)
+            if child_hash in explored:
+                continue
+            # add to frontier if not queued yet, or re-queue if the path is cheaper
+            best_g = frontier_g.get(child_hash)
+            if best_g is None or child.g < best_g:
+                frontier_g[child_hash] = child.g
+                if key is None:
+                    push(frontier, child)
+                else:
+                    seq += 1
+                    push(frontier, (key(child), seq, child))
 
-            in_frontier = False
-            for f_node in frontier:
-                if problem.state_to_hashable(f_node.state) == child_hash:
-                    in_frontier = True
-                    if child.g < f_node.g:
-                        frontier.remove(f_node)
-                        heapq.heappush(frontier, child)
-                    break
-            # add to frontier if not explored and not in frontier
-            if child_hash not in explored and not in_frontier:
-                heapq.heappush(frontier, child)
-
-        max_frontier_size = max(max_frontier_size, len(frontier))
+        node.state = None  # only queued nodes keep their state
+        max_frontier_size = max(max_frontier_size, len(frontier_g))
 
         if verbose:
             print(f"\n- Exploring node with g={node.g}, h={node.h}, f={node.f}")
-            print(f"    - Frontier size: {len(frontier)}; Explored size: {len(explored)}")
+            print(f"    - Frontier size: {len(frontier_g)}; Explored size: {len(explored)}")
 
-    return None, {
-        'nodes_generated': nodes_generated,
-        'nodes_expanded': nodes_expanded,
-        'max_frontier_size': max_frontier_size
-    }
+    return None, search_metrics('failed', nodes_generated, nodes_expanded, max_frontier_size)
+
+# beam search: each layer (one more placement) is fully expanded and only the
+# beam_width best children by f, then h, are kept. Incomplete, 'failed' can also
+# mean the beam pruned every path to a goal
+def _beam_search(problem, heuristic, verbose, stats, limit_status, beam_width=100):
+    if stats is not None:
+        problem, heuristic = _instrumented(problem, heuristic, stats)
+
+    start_node = Node(problem.initial_state, g=0, h=heuristic(problem.initial_state))
+    layer = [start_node]
+    seen = {problem.state_to_hashable(start_node.state)}
+    is_goal_node = getattr(problem, 'is_goal_node', None)
+
+    nodes_generated = 1  # starting node
+    nodes_expanded = 0
+    max_frontier_size = 1
+
+    while layer:
+        children = []
+        for node in layer:
+            status = limit_status(nodes_expanded)
+            if status:
+                return None, search_metrics(status, nodes_generated, nodes_expanded, max_frontier_size)
+
+            nodes_expanded += 1
+            if is_goal_node(node) if is_goal_node else problem.is_goal(node.state):
+                return reconstruct_path(node), search_metrics('solved', nodes_generated, nodes_expanded, max_frontier_size)
+
+            for action in problem.get_actions(node.state):
+                child = child_node(problem, node, action, heuristic)
+                if child is None:
+                    continue
+                nodes_generated += 1
+                child_hash = problem.state_to_hashable(child.state)
+                if child_hash in seen:
+                    continue
+                seen.add(child_hash)
+                children.append(child)
+
+        layer = heapq.nsmallest(beam_width, children, key=lambda node: (node.f, node.h))
+        max_frontier_size = max(max_frontier_size, len(layer))
+
+        if verbose:
+            print(f"\n- Layer with {len(children)} children, kept {len(layer)}")
+
+    return None, search_metrics('failed', nodes_generated, nodes_expanded, max_frontier_size)
 
 # this function reconstructs the path from start to goal
 def reconstruct_path(node):
@@ -90,6 +256,30 @@ def reconstruct_path(node):
         node = node.parent
     return path[::-1]
 
+# actions taken from the start to node, cheaper to keep than the full states
+def path_actions(node):
+    actions = []
+    while node.parent is not None:
+        actions.append(node.action)
+        node = node.parent
+    return actions[::-1]
+
+# lazily yields the states along a path of actions, starting from the initial state
+def replay_path(problem, actions):
+    state = problem.initial_state
+    yield state
+    for action in actions:
+        state = problem.apply_action(state, action)
+        yield state
+
 # Heuristic: count of empty cells
 def heuristic(state):
     return sum(row.count(0) for row in state)
+
+# incremental form used by child_node: a placement fills one cell, packed states
+# that may fill more (propagation) keep their own empty count
+def heuristic_from_parent(parent_node, action, new_state):
+    empty = getattr(new_state, 'empty', None)
+    return parent_node.h - 1 if empty is None else empty
+
+heuristic.incremental = heuristic_from_parent
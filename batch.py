@@ -0,0 +1,88 @@
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from sudoku import Sudoku, sudoku_parser
+from a_star import a_star, heuristic
+from sat_solver import solve_sudoku_sat
+
+# streaming batch solving: puzzles are read lazily from any iterable (grids or
+# puzzle strings, e.g. the lines of a file) and results are yielded as they
+# complete, so memory stays bounded by the chunks in flight
+
+
+def _solve_sat(puzzle, **kwargs):
+    # the cached template solver is reused by every puzzle of the process
+    solution, info = solve_sudoku_sat(puzzle, **kwargs)
+    return solution, {'clauses': info['num_clauses'], 'variables': info['num_variables'], 'status': info['status']}
+
+
+def _solve_a_star(puzzle, problem_cls=Sudoku, **kwargs):
+    env = problem_cls(puzzle)
+    path, metrics = a_star(env, heuristic, **kwargs)
+    if path is None:
+        return None, metrics
+    metrics['steps'] = len(path) - 1
+    return env.to_grid(path[-1]), metrics
+
+
+BACKENDS = {'sat': _solve_sat, 'a_star': _solve_a_star}
+
+
+def _solve_chunk(start, chunk, backend, kwargs):
+    solve = BACKENDS[backend]
+    results = []
+    for index, puzzle in enumerate(chunk, start):
+        if isinstance(puzzle, str):
+            try:
+                puzzle = sudoku_parser(puzzle.strip())
+            except ValueError as e:  # blank, header or malformed line
+                results.append((index, None, {'time': 0.0, 'status': 'error', 'error': str(e)}))
+                continue
+        begin = time.perf_counter()
+        solution, metrics = solve(puzzle, **kwargs)
+        metrics['time'] = time.perf_counter() - begin
+        results.append((index, solution, metrics))
+    return results
+
+
+def _chunks(puzzles, chunk_size):
+    iterator = iter(puzzles)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def solve_many(puzzles, backend='sat', chunk_size=64, workers=None, **solver_kwargs):
+    """
+    Yield (index, solution, metrics) for every puzzle of the iterable, solution is
+    None when the backend finds none. Strings that don't parse as a puzzle (blank or
+    header lines of a file) keep their index and get metrics with status 'error'.
+    Without workers the puzzles are solved in
+    order in this process; with workers, chunks go to a process pool (each worker
+    keeps its solver state across chunks), at most two chunks per worker are in
+    flight and results come back in completion order.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend: {backend}")
+
+    if workers is None:
+        for start, chunk in _chunks(puzzles, chunk_size):
+            yield from _solve_chunk(start, chunk, backend, solver_kwargs)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = _chunks(puzzles, chunk_size)
+        in_flight = set()
+        for start, chunk in itertools.islice(chunks, 2 * workers):
+            in_flight.add(pool.submit(_solve_chunk, start, chunk, backend, solver_kwargs))
+        while in_flight:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield from future.result()
+                for start, chunk in itertools.islice(chunks, 1):
+                    in_flight.add(pool.submit(_solve_chunk, start, chunk, backend, solver_kwargs))
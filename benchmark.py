@@ -0,0 +1,209 @@
+# benchmark.py
+# Reproducible benchmark harness: fixed seeds and puzzle sets, warmup plus repeated
+# runs timed with perf_counter_ns, median and IQR per phase, JSON output and a
+# regression check between two JSON runs.
+#
+#   python benchmark.py run -o base.json
+#   python benchmark.py compare base.json new.json --threshold 0.10
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from time import perf_counter_ns
+
+from sudoku import Sudoku, BitmaskSudoku, PropagatingSudoku, generate_random_sudoku_grid
+from a_star import a_star, heuristic
+from sat_solver import build_rules, decode_model, get_solver, reset_sat_cache, var, solve_sudoku_sat
+from dlx import solve_sudoku_dlx
+from solution_cache import SolutionCache, random_symmetry
+
+from pysat.formula import CNF
+
+
+def puzzle_set(seed, clues, count):
+    rng = random.Random(f"bench:{seed}:{clues}")
+    return [generate_random_sudoku_grid(num_clues=clues, rng=rng) for _ in range(count)]
+
+
+# every case runs once over the whole puzzle set and returns {phase: ns}
+
+# the cached solver keeps learned clauses and saved phases across calls, so a solver
+# reused from an earlier run would re-solve puzzles it has already seen: every SAT
+# run starts from a fresh one (built before the timed part)
+def _fresh_solver(size):
+    reset_sat_cache()
+    return get_solver(size)
+
+
+def bench_sat(puzzles):
+    size = len(puzzles[0])
+    start = perf_counter_ns()
+    rules, _ = build_rules(size)
+    CNF(from_clauses=[clause for clauses in rules.values() for clause in clauses])
+    phases = {'cnf_build': perf_counter_ns() - start, 'solve': 0, 'decode': 0}
+
+    solver = _fresh_solver(size)  # cached by solve_sudoku_sat, reused across the set
+    for grid in puzzles:
+        clues = [var(i, j, grid[i][j], size) for i in range(size) for j in range(size) if grid[i][j] != 0]
+        start = perf_counter_ns()
+        solver.solve(assumptions=clues)
+        model = solver.get_model()
+        phases['solve'] += perf_counter_ns() - start
+        start = perf_counter_ns()
+        decode_model(model, size)
+        phases['decode'] += perf_counter_ns() - start
+    return phases
+
+
+def _bench_search(problem_cls):
+    def bench(puzzles):
+        total, expanded = 0, 0
+        for grid in puzzles:
+            start = perf_counter_ns()
+            _, metrics = a_star(problem_cls(grid), heuristic, iteration_limit=100000)
+            total += perf_counter_ns() - start
+            expanded += metrics['nodes_expanded']
+        return {'search': total, 'expand_per_node': total // max(expanded, 1)}
+    return bench
+
+
+def bench_dlx(puzzles):
+    start = perf_counter_ns()
+    for grid in puzzles:
+        solve_sudoku_dlx(grid)
+    return {'solve': perf_counter_ns() - start}
+
+
+# repeated traffic: every puzzle comes back as VARIANTS shuffled isomorphic copies
+VARIANTS = 4
+
+
+def traffic(puzzles):
+    rng = random.Random(0)
+    work = [random_symmetry(grid, rng) for grid in puzzles for _ in range(VARIANTS)]
+    rng.shuffle(work)
+    return work
+
+
+def bench_sat_repeated(puzzles):
+    work = traffic(puzzles)
+    _fresh_solver(len(work[0]))
+    start = perf_counter_ns()
+    for grid in work:
+        solve_sudoku_sat(grid)
+    return {'solve': perf_counter_ns() - start}
+
+
+# the same traffic through a cold SolutionCache, with the time split between
+# cache hits and misses; sat_repeated.solve / sat_cached.solve is the throughput gain
+def bench_sat_cached(puzzles):
+    work = traffic(puzzles)
+    _fresh_solver(len(work[0]))
+    cache = SolutionCache()
+    phases = {'solve': 0, 'hit': 0, 'miss': 0}
+    for grid in work:
+        hits = cache.hits
+        start = perf_counter_ns()
+        cache.solve(grid)
+        ns = perf_counter_ns() - start
+        phases['hit' if cache.hits > hits else 'miss'] += ns
+        phases['solve'] += ns
+    return phases
+
+
+CASES = {
+    'sat': bench_sat,
+    'a_star': _bench_search(Sudoku),
+    'a_star_bitmask': _bench_search(BitmaskSudoku),
+    'a_star_propagating': _bench_search(PropagatingSudoku),
+    'dlx': bench_dlx,
+    'sat_repeated': bench_sat_repeated,
+    'sat_cached': bench_sat_cached,
+}
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    q1, _, q3 = statistics.quantiles(samples, n=4) if len(samples) > 1 else (samples[0],) * 3
+    return {'median_ns': statistics.median(samples), 'iqr_ns': q3 - q1, 'min_ns': samples[0], 'runs': samples}
+
+
+def run(cases=None, clues=(30, 45), count=10, repeats=5, warmup=1, seed=0):
+    cases = cases or list(CASES)
+    results = {}
+    for num_clues in clues:
+        puzzles = puzzle_set(seed, num_clues, count)
+        for case in cases:
+            for _ in range(warmup):
+                CASES[case](puzzles)
+            samples = {}
+            for _ in range(repeats):
+                for phase, ns in CASES[case](puzzles).items():
+                    samples.setdefault(phase, []).append(ns)
+            for phase, runs in samples.items():
+                results[f"{case}.{phase}@{num_clues}"] = summarize(runs)
+                print(f"{case}.{phase}@{num_clues}: median {statistics.median(runs) / 1e6:.3f} ms")
+    meta = {'seed': seed, 'clues': list(clues), 'count': count, 'repeats': repeats, 'warmup': warmup,
+            'python': platform.python_version(), 'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    return {'meta': meta, 'results': results}
+
+
+# flags every key whose median got slower than base by more than threshold and by
+# more than the base run's IQR (so noisy phases don't flag on jitter alone)
+def compare(base, new, threshold=0.10):
+    regressions = []
+    for key in sorted(set(base['results']) & set(new['results'])):
+        old_ns = base['results'][key]['median_ns']
+        new_ns = new['results'][key]['median_ns']
+        ratio = new_ns / old_ns if old_ns else float('inf')
+        flag = ''
+        if ratio > 1 + threshold and new_ns - old_ns > base['results'][key]['iqr_ns']:
+            flag = 'REGRESSION'
+            regressions.append(key)
+        elif ratio < 1 - threshold:
+            flag = 'improved'
+        print(f"{key:40s} {old_ns / 1e6:10.3f} ms -> {new_ns / 1e6:10.3f} ms  x{ratio:.2f} {flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sudoku solvers benchmark")
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_parser = sub.add_parser('run', help='run the benchmark and write JSON')
+    run_parser.add_argument('-o', '--output', default='benchmark.json')
+    run_parser.add_argument('--cases', nargs='+', choices=list(CASES))
+    run_parser.add_argument('--clues', nargs='+', type=int, default=[30, 45])
+    run_parser.add_argument('--count', type=int, default=10)
+    run_parser.add_argument('--repeats', type=int, default=5)
+    run_parser.add_argument('--warmup', type=int, default=1)
+    run_parser.add_argument('--seed', type=int, default=0)
+    compare_parser = sub.add_parser('compare', help='compare two JSON runs')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        report = run(args.cases, args.clues, args.count, args.repeats, args.warmup, args.seed)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f"Results saved to {args.output}")
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = compare(base, new, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
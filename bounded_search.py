@@ -0,0 +1,208 @@
+import functools
+import heapq
+import itertools
+
+from a_star import Node, child_node, materialize, reconstruct_path, limit_checker, search_metrics, traced
+
+INF = float('inf')
+
+# memory-bounded alternatives to a_star, same problem/heuristic interface and metrics;
+# time_limit, max_memory and track_memory work as in a_star
+
+
+# IDA*: depth-first search bounded by f, the threshold grows to the smallest f that
+# exceeded it, memory is only the current path
+def ida_star(problem, heuristic, verbose=False, iteration_limit=500000, time_limit=None, max_memory=None,
+             track_memory=False):
+    search = functools.partial(_ida_star, problem, heuristic, verbose,
+                               limit_checker(iteration_limit, time_limit, max_memory))
+    return traced(search, track_memory, max_memory)
+
+
+def _ida_star(problem, heuristic, verbose, limit_status):
+    root = Node(problem.initial_state, g=0, h=heuristic(problem.initial_state))
+    is_goal_node = getattr(problem, 'is_goal_node', None)
+
+    nodes_generated = 1  # starting node
+    nodes_expanded = 0
+    max_frontier_size = 1
+
+    def metrics(status):
+        return search_metrics(status, nodes_generated, nodes_expanded, max_frontier_size)
+
+    threshold = root.f
+    while True:
+        next_threshold = INF
+        # each entry: node, iterator over its remaining actions, state key
+        stack = [[root, None, problem.state_to_hashable(root.state)]]
+        on_path = {stack[0][2]}
+        while stack:
+            entry = stack[-1]
+            node, actions, key = entry
+            if actions is None: # first visit
+                if node.f > threshold:
+                    next_threshold = min(next_threshold, node.f)
+                    stack.pop()
+                    on_path.discard(key)
+                    continue
+                status = limit_status(nodes_expanded)
+                if status:
+                    return None, metrics(status)
+                nodes_expanded += 1
+                if is_goal_node(node) if is_goal_node else problem.is_goal(node.state):
+                    return reconstruct_path(node), metrics('solved')
+                entry[1] = iter(problem.get_actions(node.state))
+                continue
+
+            # descend into the next child not already on the current path
+            for action in actions:
+                child = child_node(problem, node, action, heuristic)
+                if child is None:
+                    continue
+                nodes_generated += 1
+                child_key = problem.state_to_hashable(child.state)
+                if child_key in on_path:
+                    continue
+                on_path.add(child_key)
+                stack.append([child, None, child_key])
+                max_frontier_size = max(max_frontier_size, len(stack))
+                break
+            else:
+                stack.pop()
+                on_path.discard(key)
+
+        if verbose:
+            print(f"\n- Threshold {threshold} exhausted, next threshold: {next_threshold}")
+            print(f"    - Nodes expanded: {nodes_expanded}")
+        if next_threshold == INF:
+            return None, metrics('failed')
+        threshold = next_threshold
+
+
+class BoundedNode(Node):
+    __slots__ = ('children', 'forgotten_f', 'queued', 'seq')
+
+    def __init__(self, state, parent=None, g=0, h=0, action=None):
+        super().__init__(state, parent, g, h, action)
+        self.children = 0  # successors currently held in memory
+        self.forgotten_f = INF  # best f among dropped successors
+        self.queued = False
+        self.seq = -1
+
+
+# simplified memory-bounded A* (SMA*): at most max_nodes nodes are kept, when the
+# budget is exceeded the shallowest leaf with the highest f is dropped and its f is
+# backed up into the parent, which is queued again once all its successors are gone.
+# Tree search, there is no closed set.
+def sma_star(problem, heuristic, max_nodes=10000, verbose=False, iteration_limit=500000, time_limit=None,
+             max_memory=None, track_memory=False):
+    search = functools.partial(_sma_star, problem, heuristic, max_nodes, verbose,
+                               limit_checker(iteration_limit, time_limit, max_memory))
+    return traced(search, track_memory, max_memory)
+
+
+def _sma_star(problem, heuristic, max_nodes, verbose, limit_status):
+    root = BoundedNode(problem.initial_state, g=0, h=heuristic(problem.initial_state))
+    is_goal_node = getattr(problem, 'is_goal_node', None)
+    best = []   # (f, -g, seq, node): deepest lowest-f leaf first
+    worst = []  # (-f, g, seq, node): shallowest highest-f leaf first
+    counter = itertools.count()
+
+    nodes_generated = 1  # starting node
+    nodes_expanded = 0
+    nodes_forgotten = 0
+    max_frontier_size = 1
+    queued = 0
+    in_memory = 1
+
+    def metrics(status):
+        return search_metrics(status, nodes_generated, nodes_expanded, max_frontier_size, nodes_forgotten=nodes_forgotten)
+
+    # heap entries are stale once their node is dequeued or queued again (seq changes)
+    def push(node):
+        nonlocal queued, best, worst
+        node.queued = True
+        node.seq = next(counter)
+        queued += 1
+        heapq.heappush(best, (node.f, -node.g, node.seq, node))
+        heapq.heappush(worst, (-node.f, node.g, node.seq, node))
+        if len(best) > 2 * queued + 64: # drop stale entries so they don't pin forgotten nodes
+            best = [e for e in best if e[3].queued and e[3].seq == e[2]]
+            worst = [e for e in worst if e[3].queued and e[3].seq == e[2]]
+            heapq.heapify(best)
+            heapq.heapify(worst)
+
+    def pop(heap):
+        nonlocal queued
+        while heap:
+            node, seq = heap[0][3], heap[0][2]
+            heapq.heappop(heap)
+            if node.queued and node.seq == seq:
+                node.queued = False
+                queued -= 1
+                return node
+        return None
+
+    # removes a leaf from memory, backing its f up the tree
+    def forget(node):
+        nonlocal in_memory, nodes_forgotten
+        while True:
+            in_memory -= 1
+            nodes_forgotten += 1
+            node.state = None
+            parent = node.parent
+            if parent is None:
+                return
+            parent.forgotten_f = min(parent.forgotten_f, node.f)
+            parent.children -= 1
+            if parent.children > 0:
+                return
+            # no successor left in memory: the parent is a leaf again
+            parent.f = parent.forgotten_f
+            if parent.f < INF:
+                push(parent)
+                return
+            node = parent  # every successor was a dead end
+
+    push(root)
+    while True:
+        node = pop(best)
+        if node is None or node.f == INF:
+            return None, metrics('failed')
+        status = limit_status(nodes_expanded)
+        if status:
+            return None, metrics(status)
+
+        materialize(problem, node)
+        nodes_expanded += 1
+        if is_goal_node(node) if is_goal_node else problem.is_goal(node.state):
+            return reconstruct_path(node), metrics('solved')
+
+        # successors are regenerated in full, forgotten f values are recomputed
+        node.forgotten_f = INF
+        children = []
+        for action in problem.get_actions(node.state):
+            child = child_node(problem, node, action, heuristic, BoundedNode)
+            if child is None:
+                continue
+            nodes_generated += 1
+            child.f = max(child.f, node.f)  # pathmax, f never decreases along a path
+            child.state = None  # rebuilt from the parent when popped
+            children.append(child)
+
+        if not children:
+            node.f = INF
+            forget(node)
+            continue
+
+        node.children = len(children)
+        in_memory += len(children)
+        for child in children:
+            push(child)
+        while in_memory > max_nodes and queued > 1:
+            forget(pop(worst))
+        max_frontier_size = max(max_frontier_size, queued)
+
+        if verbose:
+            print(f"\n- Exploring node with g={node.g}, h={node.h}, f={node.f}")
+            print(f"    - Frontier size: {queued}; Nodes in memory: {in_memory}")
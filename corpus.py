@@ -0,0 +1,78 @@
+import itertools
+import os
+import struct
+import numpy as np
+
+from sudoku import parse_sudoku_lines, get_sudokus_from_web
+
+# packed on-disk puzzle corpus: a 16-byte header (magic, grid size, block size,
+# puzzle count) followed by one byte per cell, row-major, 0 for empty cells.
+# Loading memory-maps the cells, so opening a large corpus costs nothing and
+# slicing by index only reads the puzzles it touches.
+MAGIC = b'SDKC'
+HEADER = struct.Struct('<4sBBxxQ')
+
+
+def write_corpus(path, grids, size=9, block=3):
+    # grids can be any iterable, they are streamed to disk one at a time
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, size, block, 0))
+        for grid in grids:
+            if len(grid) != size or any(len(row) != size for row in grid):
+                raise ValueError(f"puzzle {count} is not {size}x{size}")
+            f.write(bytes(cell for row in grid for cell in row))
+            count += 1
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, size, block, count))
+    return count
+
+
+# converts a text file with one puzzle per line (e.g. top2365) to a corpus, the
+# grid size is taken from the first puzzle
+def import_text(src_path, dst_path):
+    with open(src_path) as f:
+        grids = parse_sudoku_lines(f)
+        first = next(grids, None)
+        if first is None:
+            return write_corpus(dst_path, [])
+        size = len(first)
+        return write_corpus(dst_path, itertools.chain([first], grids), size, int(size**0.5))
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        magic, size, block, count = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a puzzle corpus")
+    return size, block, count
+
+
+def is_corpus(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+# read-only (count, size, size) uint8 array backed by the file
+def load_corpus(path):
+    size, block, count = read_header(path)
+    if count == 0:
+        return np.zeros((0, size, size), dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER.size, shape=(count, size, size))
+
+
+# yields puzzles as lists of lists, the format the solvers take
+def iter_corpus(path, start=0, stop=None):
+    for grid in load_corpus(path)[start:stop]:
+        yield grid.tolist()
+
+
+# puzzles from a URL, a packed corpus or a text file with one puzzle per line
+def load_sudokus(source, num=None):
+    if not os.path.exists(source):
+        sudokus = get_sudokus_from_web(source)
+        return sudokus[:num] if num is not None else sudokus
+    if is_corpus(source):
+        return list(iter_corpus(source, 0, num))
+    with open(source) as f:
+        return list(itertools.islice(parse_sudoku_lines(f), num))
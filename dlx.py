@@ -0,0 +1,160 @@
+# Dancing Links (Algorithm X) exact cover solver for Sudoku. The links live in flat
+# integer lists indexed by node id (no per-node objects): node 0 is the root, then
+# one header per constraint column, then one node per (candidate, constraint) pair.
+
+
+# constraint columns of placing digit d (0-based) in cell (i, j)
+def constraints(i, j, d, size, block):
+    n2 = size * size
+    b = (i // block) * block + j // block
+    return (i*size + j, n2 + i*size + d, 2*n2 + j*size + d, 3*n2 + b*size + d)
+
+
+def solve_sudoku_dlx(grid):
+    # solves a Sudoku puzzle as exact cover, same (solution, info) shape as the SAT solver
+    size = len(grid)
+    block = int(size**0.5)
+
+    # the givens satisfy their constraints up front, only the rest become columns
+    satisfied = set()
+    for i in range(size):
+        for j in range(size):
+            if grid[i][j] != 0:
+                cols = constraints(i, j, grid[i][j] - 1, size, block)
+                if satisfied.intersection(cols):
+                    return None, {'rows': 0, 'columns': 0, 'nodes': 0, 'updates': 0}  # clashing clues
+                satisfied.update(cols)
+
+    candidates = []
+    for i in range(size):
+        for j in range(size):
+            if grid[i][j] == 0:
+                for d in range(size):
+                    cols = constraints(i, j, d, size, block)
+                    if not satisfied.intersection(cols):
+                        candidates.append(((i, j, d + 1), cols))
+    column_ids = sorted(set(range(4 * size * size)) - satisfied)
+    header = {col: k + 1 for k, col in enumerate(column_ids)}
+    ncols = len(column_ids)
+
+    # headers form a circular list through L/R starting at the root
+    L = list(range(-1, ncols))
+    L[0] = ncols
+    R = list(range(1, ncols + 2)); R[ncols] = 0
+    U = list(range(ncols + 1))
+    D = list(range(ncols + 1))
+    C = list(range(ncols + 1))
+    S = [0] * (ncols + 1)
+    ROW = [-1] * (ncols + 1)
+
+    for row, (_, cols) in enumerate(candidates):
+        first = len(C)
+        for col in cols:
+            c = header[col]
+            node = len(C)
+            C.append(c)
+            ROW.append(row)
+            # append at the bottom of column c
+            U.append(U[c])
+            D.append(c)
+            D[U[c]] = node
+            U[c] = node
+            S[c] += 1
+            # append at the end of the row
+            L.append(node - 1 if node > first else node)
+            R.append(first)
+            if node > first:
+                R[node - 1] = node
+                L[first] = node
+
+    updates = 0
+
+    def cover(c):
+        nonlocal updates
+        L[R[c]] = L[c]
+        R[L[c]] = R[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                updates += 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(c):
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        L[R[c]] = c
+        R[L[c]] = c
+
+    def select(r):
+        j = R[r]
+        while j != r:
+            cover(C[j])
+            j = R[j]
+
+    def unselect(r):
+        j = L[r]
+        while j != r:
+            uncover(C[j])
+            j = L[j]
+
+    # iterative Algorithm X: chosen holds the selected row node per level
+    chosen = []
+    nodes = 0
+    solved = False
+    while True:
+        if R[0] == 0:
+            solved = True
+            break
+        # column with the fewest remaining rows
+        c, best, k = 0, -1, R[0]
+        while k != 0:
+            if best < 0 or S[k] < best:
+                c, best = k, S[k]
+                if best <= 1:
+                    break
+            k = R[k]
+
+        r = c
+        if best > 0:
+            cover(c)
+            r = D[c]
+            nodes += 1
+            select(r)
+            chosen.append(r)
+            continue
+
+        # dead end: move to the next row of the deepest level that still has one
+        while chosen:
+            r = chosen.pop()
+            unselect(r)
+            c = C[r]
+            r = D[r]
+            if r != c:
+                nodes += 1
+                select(r)
+                chosen.append(r)
+                break
+            uncover(c)
+        else:
+            break
+
+    info = {'rows': len(candidates), 'columns': ncols, 'nodes': nodes, 'updates': updates}
+    if not solved:
+        return None, info
+    solution = [row[:] for row in grid]
+    for r in chosen:
+        (i, j, num), _ = candidates[ROW[r]]
+        solution[i][j] = num
+    return solution, info
@@ -0,0 +1,103 @@
+import numpy as np
+
+# batch versions of the per-grid checks in sudoku.py: every function takes a stack of
+# grids, an (N, size, size) array (e.g. corpus.load_corpus) or a list of lists, and
+# works on all of them at once through one-hot digit counts per row, column and block.
+# Large stacks are processed in chunks so the one-hot arrays stay small.
+CHUNK = 4096
+
+
+def as_grid_array(grids):
+    grids = np.asarray(grids, dtype=np.uint8)
+    if grids.ndim == 2:
+        grids = grids[None]
+    if grids.ndim != 3 or grids.shape[1] != grids.shape[2]:
+        raise ValueError(f"expected (N, size, size) grids, got shape {grids.shape}")
+    return grids
+
+
+# (N, size, size, size) bool, [n, i, j, d] true when cell (i, j) holds digit d+1
+def one_hot(grids):
+    size = grids.shape[1]
+    return grids[..., None] == np.arange(1, size + 1, dtype=np.uint8)
+
+
+# digit counts per unit, each (N, size, size) with the digit on the last axis
+def unit_counts(onehot, block):
+    n, size = onehot.shape[0], onehot.shape[1]
+    rows = onehot.sum(axis=2, dtype=np.uint8)
+    cols = onehot.sum(axis=1, dtype=np.uint8)
+    boxes = onehot.reshape(n, size // block, block, size // block, block, size)
+    boxes = boxes.sum(axis=(2, 4), dtype=np.uint8).reshape(n, size, size)
+    return rows, cols, boxes
+
+
+def _chunked(func, grids, block, chunk):
+    grids = as_grid_array(grids)
+    block = block or int(grids.shape[1]**0.5)
+    if len(grids) == 0:
+        return np.zeros(0, dtype=bool)
+    return np.concatenate([func(grids[k:k + chunk], block) for k in range(0, len(grids), chunk)])
+
+
+def _valid(grids, block):
+    rows, cols, boxes = unit_counts(one_hot(grids), block)
+    return (rows == 1).all(axis=(1, 2)) & (cols == 1).all(axis=(1, 2)) & (boxes == 1).all(axis=(1, 2))
+
+
+def _consistent(grids, block):
+    rows, cols, boxes = unit_counts(one_hot(grids), block)
+    return (rows <= 1).all(axis=(1, 2)) & (cols <= 1).all(axis=(1, 2)) & (boxes <= 1).all(axis=(1, 2))
+
+
+# (N,) bool: grid is complete and every row, column and block holds each digit once
+def validate_grids(grids, block=None, chunk=CHUNK):
+    return _chunked(_valid, grids, block, chunk)
+
+
+# (N,) bool: no digit repeats in a unit, empty cells allowed (puzzles)
+def consistent_grids(grids, block=None, chunk=CHUNK):
+    return _chunked(_consistent, grids, block, chunk)
+
+
+# (N,) bool: solutions are valid and keep every clue of their puzzle
+def check_solutions(puzzles, solutions, block=None, chunk=CHUNK):
+    puzzles, solutions = as_grid_array(puzzles), as_grid_array(solutions)
+    keeps_clues = ((puzzles == 0) | (puzzles == solutions)).all(axis=(1, 2))
+    return keeps_clues & validate_grids(solutions, block, chunk)
+
+
+def clue_counts(grids):
+    return np.count_nonzero(as_grid_array(grids), axis=(1, 2))
+
+
+# (N, size, size) candidate count per cell, 0 on filled cells
+def candidate_counts(grids, block=None):
+    grids = as_grid_array(grids)
+    n, size = grids.shape[0], grids.shape[1]
+    block = block or int(size**0.5)
+    rows, cols, boxes = unit_counts(one_hot(grids), block)
+    boxes = boxes.reshape(n, size // block, size // block, size)
+    boxes = boxes.repeat(block, axis=1).repeat(block, axis=2)
+    used = (rows[:, :, None, :] > 0) | (cols[:, None, :, :] > 0) | (boxes > 0)
+    counts = size - used.sum(axis=3)
+    counts[grids != 0] = 0
+    return counts
+
+
+# simple per-puzzle difficulty features, each an (N,) array
+def difficulty_features(grids, block=None, chunk=CHUNK):
+    grids = as_grid_array(grids)
+    features = {'clues': [], 'mean_candidates': [], 'min_candidates': [], 'naked_singles': [], 'dead_cells': []}
+    for k in range(0, len(grids), chunk):
+        part = grids[k:k + chunk]
+        counts = candidate_counts(part, block)
+        empty = part == 0
+        num_empty = empty.sum(axis=(1, 2))
+        features['clues'].append(part[0].size - num_empty)
+        features['mean_candidates'].append(counts.sum(axis=(1, 2)) / np.maximum(num_empty, 1))
+        min_counts = np.where(empty, counts, part.shape[1]).min(axis=(1, 2))
+        features['min_candidates'].append(np.where(num_empty > 0, min_counts, 0))
+        features['naked_singles'].append((empty & (counts == 1)).sum(axis=(1, 2)))
+        features['dead_cells'].append((empty & (counts == 0)).sum(axis=(1, 2)))  # no candidate left
+    return {name: np.concatenate(values) if values else np.zeros(0) for name, values in features.items()}
@@ -0,0 +1,100 @@
+import cProfile
+import io
+import pstats
+import tracemalloc
+from time import perf_counter_ns
+
+# opt-in instrumentation: a_star and solve_sudoku_sat take stats=SearchStats() and
+# only wrap their hot calls when one is given, so disabled runs pay nothing
+
+
+class SearchStats:
+    def __init__(self):
+        self.time_ns = {}   # phase -> accumulated ns
+        self.calls = {}     # phase -> number of calls
+        self.counters = {}  # e.g. solver conflicts / decisions / propagations
+
+    def add(self, phase, ns):
+        self.time_ns[phase] = self.time_ns.get(phase, 0) + ns
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def count(self, values):
+        for name, value in values.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def timed(self, phase, func):
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(phase, perf_counter_ns() - start)
+        return wrapper
+
+    def report(self):
+        return {
+            'time_ns': dict(self.time_ns),
+            'calls': dict(self.calls),
+            'counters': dict(self.counters),
+        }
+
+    def print_report(self):
+        total = sum(self.time_ns.values()) or 1
+        for phase, ns in sorted(self.time_ns.items(), key=lambda item: -item[1]):
+            print(f"{phase:15s} {ns / 1e6:10.3f} ms {100 * ns / total:5.1f}%  calls: {self.calls[phase]}")
+        for name, value in self.counters.items():
+            print(f"{name:15s} {value}")
+
+
+# same interface as the wrapped problem, with every problem call timed
+class TimedProblem:
+    def __init__(self, problem, stats):
+        self.problem = problem
+        self.initial_state = problem.initial_state
+        self.get_actions = stats.timed('get_actions', problem.get_actions)
+        self.apply_action = stats.timed('apply_action', problem.apply_action)
+        self.is_goal = stats.timed('goal', problem.is_goal)
+        self.state_to_hashable = stats.timed('hashing', problem.state_to_hashable)
+        if hasattr(problem, 'is_goal_node'):
+            self.is_goal_node = stats.timed('goal', problem.is_goal_node)
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+
+def timed_heuristic(heuristic, stats):
+    timed = stats.timed('heuristic', heuristic)
+    incremental = getattr(heuristic, 'incremental', None)
+    if incremental is not None:
+        timed.incremental = stats.timed('heuristic', incremental)
+    return timed
+
+
+# runs func once under cProfile (mode='cprofile') or tracemalloc (mode='tracemalloc')
+# and prints the top entries, returns what func returns
+def profile_run(func, *args, mode='cprofile', limit=20, **kwargs):
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func, *args, **kwargs)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+        print(out.getvalue())
+        return result
+
+    if mode == 'tracemalloc':
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            result = func(*args, **kwargs)
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started:
+                tracemalloc.stop()
+        print(f"Current memory: {current / 1024:.1f} KiB; peak: {peak / 1024:.1f} KiB")
+        for stat in snapshot.statistics('lineno')[:limit]:
+            print(stat)
+        return result
+
+    raise ValueError(f"unknown profiling mode: {mode}")
@@ -7,7 +7,7 @@ if __name__ == "__main__":
     print("Generated Sudoku Puzzle:")
     pretty_print(puzzle)
 
-    solution, clauses = solve_sudoku_sat(puzzle)
+    solution, info = solve_sudoku_sat(puzzle)
     if solution:
         if check_solution(solution):
             print("\nSudoku solved with SAT:")
@@ -17,7 +17,7 @@ if __name__ == "__main__":
     else:
         print("No SAT solution.")
     
-    #print_clauses(clauses)
+    #print_clauses(solve_sudoku_sat(puzzle, record_clauses=True)[1]['clauses'])
 
 
     env = Sudoku(puzzle)
@@ -1,6 +1,21 @@
+from pysat.card import CardEnc, EncType
+from pysat.formula import CNF
+from pysat.solvers import Solver
+import multiprocessing as mp
+import threading
+from queue import Empty
+from time import perf_counter, perf_counter_ns
 
-from pysat.solvers import Glucose3
+# the static rules (1-4 and 6) only depend on the grid size, so they are built once
+# per size and loaded into one long-lived incremental solver per backend; the clues
+# (rule 5) are passed to each solve as assumptions
+_templates = {}
+_solvers = {}
 
+# PySAT backends compared by the tester, any other PySAT solver name works too.
+# Not every backend supports every budget: lingeling has no limited solving and
+# cadical no propagation budget or interrupts (NotImplementedError from PySAT)
+SAT_BACKENDS = ('glucose3', 'glucose4', 'cadical153', 'maplechrono', 'minisat22', 'lingeling')
 
 
 def print_clauses(all_clauses):
@@ -10,87 +25,338 @@ def print_clauses(all_clauses):
                 print(clause)
 
 
-def solve_sudoku_sat(grid):
-    clauses = {'rule 1': [], 'rule 2': [], 'rule 3': [], 'rule 4': [], 'rule 5': [], 'rule 6': []}
-    # solves a Sudoku puzzle using SAT solver
-    size = len(grid)  
-    solver = Glucose3()
+# Helper: map (i,j,n) -> variable number
+def var(i, j, n, size):
+    return i*size*size + j*size + n
 
-    # Helper: map (i,j,n) -> variable number
-    def var(i, j, n):
-        return i*size*size + j*size + n
 
-    # rule 1: each cell has at least one number 
-    for i in range(size):
-        for j in range(size):
-            clause = [var(i, j, n+1) for n in range(size)] # makes clause [X001, X002, ..., X009]
-            solver.add_clause(clause)
-            clauses['rule 1'].append(clause)
+# at-most-one encodings: pairwise is quadratic in the group size, the sequential
+# counter and commander encodings are linear at the price of auxiliary variables
+AMO_ENCODINGS = ('pairwise', 'seqcounter', 'commander')
+
+
+def pairwise_amo(lits):
+    return [[-lits[a], -lits[b]] for a in range(len(lits)) for b in range(a+1, len(lits))]
+
+
+# commander encoding, groups of 3 with pairwise AMO inside, each literal implies
+# its group commander and the commanders get an AMO themselves
+def commander_amo(lits, top):
+    clauses = []
+    while len(lits) > 3:
+        commanders = []
+        for k in range(0, len(lits), 3):
+            group = lits[k:k+3]
+            if len(group) == 1:
+                commanders.append(group[0])
+                continue
+            top += 1
+            clauses += pairwise_amo(group)
+            clauses += [[-lit, top] for lit in group]
+            commanders.append(top)
+        lits = commanders
+    return clauses + pairwise_amo(lits), top
+
 
-    # rule 2: each cell has at most one number
+def at_most_one(lits, top, encoding):
+    if len(lits) < 2:
+        return [], top
+    if encoding == 'pairwise':
+        return pairwise_amo(lits), top
+    if encoding == 'commander':
+        return commander_amo(lits, top)
+    if encoding == 'seqcounter':
+        enc = CardEnc.atmost(lits=lits, bound=1, top_id=top, encoding=EncType.seqcounter)
+        return enc.clauses, max(top, enc.nv)
+    raise ValueError(f"unknown at-most-one encoding: {encoding}")
+
+
+# every constraint as (at-least-one rule, at-most-one rule, literals)
+def sudoku_groups(size):
+    block_size = int(size**0.5)  # es. 2 per 4x4, 3 per 9x9
+    # rule 1 / rule 2: each cell has at least one / at most one number
     for i in range(size):
         for j in range(size):
-            for n1 in range(size):
-                for n2 in range(n1+1, size):
-                    solver.add_clause([-var(i,j,n1+1), -var(i,j,n2+1)]) # makes clauses: [¬X001, ¬X002], [¬X001, ¬X003], ...
-                    clauses['rule 2'].append([-var(i,j,n1+1), -var(i,j,n2+1)])
-
+            yield 'rule 1', 'rule 2', [var(i, j, n+1, size) for n in range(size)] # [X001, X002, ..., X009]
     # rule 3: Row unique
     for i in range(size):
         for n in range(size):
-            for j1 in range(size):
-                for j2 in range(j1+1, size):
-                    solver.add_clause([-var(i,j1,n+1), -var(i,j2,n+1)]) # makes clauses: [¬X001, -X011], [¬X001, -X021], ...
-                    clauses['rule 3'].append([-var(i,j1,n+1), -var(i,j2,n+1)])
+            yield None, 'rule 3', [var(i, j, n+1, size) for j in range(size)] # [X001, X011, ..., X081]
     # rule 4: Column unique
     for j in range(size):
         for n in range(size):
-            for i1 in range(size):
-                for i2 in range(i1+1, size):
-                    solver.add_clause([-var(i1,j,n+1), -var(i2,j,n+1)]) # makes clauses: [¬X001, -X101], [¬X001, -X201], ...
-                    clauses['rule 4'].append([-var(i1,j,n+1), -var(i2,j,n+1)])
+            yield None, 'rule 4', [var(i, j, n+1, size) for i in range(size)] # [X001, X101, ..., X801]
+    # rule 6: Block unique
+    for bi in range(0, size, block_size):
+        for bj in range(0, size, block_size):
+            for n in range(size):
+                yield None, 'rule 6', [var(i, j, n+1, size) for i in range(bi, bi + block_size)
+                                       for j in range(bj, bj + block_size)]
 
-    # rule 5: Pre-filled cells must retain their numbers
+
+# clue-reduced variables: the cell/digit pairs the givens leave open, variables the
+# clues force to true or false are eliminated instead of being encoded
+def open_variables(grid):
+    size = len(grid)
+    block_size = int(size**0.5)
+    rows, cols, blocks = [set() for _ in range(size)], [set() for _ in range(size)], [set() for _ in range(size)]
     for i in range(size):
         for j in range(size):
             if grid[i][j] != 0:
-                solver.add_clause([var(i,j,grid[i][j])]) # makes clause: [X005] for a cell pre-filled with 5
-                clauses['rule 5'].append([var(i,j,grid[i][j])])
+                rows[i].add(grid[i][j])
+                cols[j].add(grid[i][j])
+                blocks[(i // block_size) * block_size + j // block_size].add(grid[i][j])
+    live = set()
+    for i in range(size):
+        for j in range(size):
+            if grid[i][j] == 0:
+                used = rows[i] | cols[j] | blocks[(i // block_size) * block_size + j // block_size]
+                live.update(var(i, j, n, size) for n in range(1, size + 1) if n not in used)
+    return live
 
 
-    block_size = int(size**0.5)  # es. 2 per 4x4, 3 per 9x9
+# builds the clauses per rule, with grid given only the open variables are encoded
+# (groups holding a given are already satisfied and dropped); returns the top var id
+def build_rules(size, encoding='pairwise', grid=None):
+    rules = {'rule 1': [], 'rule 2': [], 'rule 3': [], 'rule 4': [], 'rule 6': []}
+    top = size**3
+    live = open_variables(grid) if grid is not None else None
+    given = {var(i, j, grid[i][j], size) for i in range(size) for j in range(size) if grid[i][j] != 0} if grid is not None else ()
+
+    for alo_rule, amo_rule, lits in sudoku_groups(size):
+        if live is not None:
+            if any(lit in given for lit in lits):
+                continue
+            lits = [lit for lit in lits if lit in live]
+        if alo_rule:
+            rules[alo_rule].append(lits) # an empty clause here means the clues clash
+        clauses, top = at_most_one(lits, top, encoding)
+        rules[amo_rule] += clauses
+    return rules, top
+
+
+# static rules and their flattened CNF for a grid size and encoding, built on first use
+def sudoku_template(size, encoding='pairwise'):
+    if (size, encoding) not in _templates:
+        rules, top = build_rules(size, encoding)
+        cnf = CNF(from_clauses=[clause for clauses in rules.values() for clause in clauses])
+        cnf.nv = top
+        _templates[size, encoding] = (rules, cnf)
+    return _templates[size, encoding]
+
+
+def get_solver(size, encoding='pairwise', backend='glucose3'):
+    if (size, encoding, backend) not in _solvers:
+        _solvers[size, encoding, backend] = Solver(name=backend, bootstrap_with=sudoku_template(size, encoding)[1].clauses)
+    return _solvers[size, encoding, backend]
 
-    # rule 6: Block unique
-    for bi in range(0, size, block_size):
-        for bj in range(0, size, block_size):
-            for n in range(size):
-                cells_in_block = []
-                # collect all cells in the block
-                for i in range(bi, bi + block_size):
-                    for j in range(bj, bj + block_size):
-                        cells_in_block.append((i, j))
-                # add clauses to ensure uniqueness in the block
-                for idx1 in range(len(cells_in_block)):
-                    for idx2 in range(idx1 + 1, len(cells_in_block)):
-                        i1, j1 = cells_in_block[idx1]
-                        i2, j2 = cells_in_block[idx2]
-                        solver.add_clause([-var(i1, j1, n+1), -var(i2, j2, n+1)]) # makes clauses: [¬X001, -X011], [¬X001, -X021], ...
-                        clauses['rule 6'].append([-var(i1, j1, n+1), -var(i2, j2, n+1)])
 
+# frees the cached solvers (they hold native memory), templates are rebuilt lazily
+def reset_sat_cache():
+    for solver in _solvers.values():
+        solver.delete()
+    _solvers.clear()
+    _templates.clear()
+
+
+# record_clauses=True also returns the clauses per rule (for print_clauses), the
+# counts are always returned; on UNSAT the solution is None with the same info.
+# encoding picks the at-most-one encoding, reduce=True builds a per-puzzle CNF over
+# the variables the clues leave open instead of reusing the cached template.
+# backend: the PySAT solver, see SAT_BACKENDS
+# stats: optional instrumentation.SearchStats, gets encode/solve/decode times and
+# the solver's conflicts, decisions and propagations.
+# budgets: conflict_budget, propagation_budget and time_limit (seconds) stop the
+# solve early, info['status'] is then 'budget_limit' or 'time_limit' instead of
+# 'solved' / 'failed'
+def solve_sudoku_sat(grid, record_clauses=False, encoding='pairwise', reduce=False, stats=None, backend='glucose3', **budgets):
+    if reduce:
+        return solve_reduced(grid, record_clauses, encoding, stats, backend, **budgets)
+    # solves a Sudoku puzzle using SAT solver
+    start = perf_counter_ns()
+    size = len(grid)
+    rules, cnf = sudoku_template(size, encoding)
+    solver = get_solver(size, encoding, backend)
+
+    # rule 5: Pre-filled cells must retain their numbers
+    clues = [var(i,j,grid[i][j],size) for i in range(size) for j in range(size) if grid[i][j] != 0] # [X005] for a cell pre-filled with 5
+    info = {'num_clauses': len(cnf.clauses) + len(clues), 'num_variables': cnf.nv, 'clauses': None}
+    if record_clauses:
+        info['clauses'] = {'rule 1': rules['rule 1'], 'rule 2': rules['rule 2'], 'rule 3': rules['rule 3'],
+                           'rule 4': rules['rule 4'], 'rule 5': [[lit] for lit in clues], 'rule 6': rules['rule 6']}
 
     # solve the SAT problem
-    if solver.solve():
-        model = solver.get_model()
-        solution = [[0]*size for _ in range(size)]
+    if stats is None and not budgets:
+        if solver.solve(assumptions=clues):
+            info['status'] = 'solved'
+            return decode_model(solver.get_model(), size), info
+        info['status'] = 'failed'
+        return None, info
+    if stats is not None:
+        stats.add('encode', perf_counter_ns() - start)
+    model, info['status'] = run_solver(solver, clues, stats, **budgets)
+    return decode_model(model, size, stats) if model else None, info
+
+
+# solves under optional budgets and stats, returns (model or None, status).
+# Glucose checks budgets and interrupts between restarts, so limits are approximate
+def run_solver(solver, assumptions=(), stats=None, conflict_budget=None, propagation_budget=None, time_limit=None):
+    if stats is not None:
+        before = solver.accum_stats()
+        start = perf_counter_ns()
+
+    timer = None
+    fired = []
+    if conflict_budget is None and propagation_budget is None and time_limit is None:
+        satisfiable = solver.solve(assumptions=assumptions)
+    else:
+        # budgets stay set on the solver, so unused ones are switched off explicitly
+        for set_budget, budget in ((solver.conf_budget, conflict_budget), (solver.prop_budget, propagation_budget)):
+            try:
+                set_budget(budget if budget is not None else -1)
+            except NotImplementedError:  # e.g. no propagation limit in CaDiCaL
+                if budget is not None:
+                    raise
+        if time_limit is not None:
+            solver.clear_interrupt()  # raises here, not in the timer, if the backend can't be interrupted
+            timer = threading.Timer(time_limit, lambda: fired.append(True) or solver.interrupt())
+            timer.start()
+        try:
+            satisfiable = solver.solve_limited(assumptions=assumptions, expect_interrupt=timer is not None)
+        finally:
+            if timer is not None:
+                timer.cancel()
+                solver.clear_interrupt()
+
+    if stats is not None:
+        stats.add('solve', perf_counter_ns() - start)
+        after = solver.accum_stats()
+        stats.count({name: after[name] - before.get(name, 0) for name in after})
+
+    if satisfiable is None:
+        return None, 'time_limit' if fired else 'budget_limit'
+    if not satisfiable:
+        return None, 'failed'
+    return solver.get_model(), 'solved'
+
+
+def solve_reduced(grid, record_clauses=False, encoding='pairwise', stats=None, backend='glucose3', **budgets):
+    start = perf_counter_ns()
+    size = len(grid)
+    rules, top = build_rules(size, encoding, grid)
+    live = open_variables(grid)
+    clauses = [clause for sub_clauses in rules.values() for clause in sub_clauses]
+    info = {'num_clauses': len(clauses), 'num_variables': len(live) + top - size**3,
+            'clauses': rules if record_clauses else None, 'status': 'failed'}
+
+    if [] in rules['rule 1'] or not Sudoku(grid, size, int(size**0.5)).consistent:
+        return None, info  # some cell has no candidate left, or two clues clash
+    with Solver(name=backend, bootstrap_with=clauses) as solver:
+        if stats is not None:
+            stats.add('encode', perf_counter_ns() - start)
+        model, info['status'] = run_solver(solver, (), stats, **budgets)
+    if model is None:
+        return None, info
+
+    # unconstrained variables may come back true, only open ones are decoded
+    solution = decode_model([lit for lit in model if lit in live], size, stats)
+    for i in range(size):
+        for j in range(size):
+            if grid[i][j] != 0:
+                solution[i][j] = grid[i][j]
+    return solution, info
+
+
+# counts solutions up to limit: each model found is blocked on the cells that were
+# empty and the solver is asked again; uses its own solver so the blocking clauses
+# don't leak into the cached one
+def count_solutions_sat(grid, limit=2, encoding='pairwise', backend='glucose3'):
+    size = len(grid)
+    cnf = sudoku_template(size, encoding)[1]
+    empty = [(i, j) for i in range(size) for j in range(size) if grid[i][j] == 0]
+    count = 0
+    with Solver(name=backend, bootstrap_with=cnf.clauses) as solver:
         for i in range(size):
             for j in range(size):
-                for n in range(size):
-                    if var(i,j,n+1) in model:
-                        solution[i][j] = n+1
-        return solution, clauses
-    else:
-        return None
+                if grid[i][j] != 0:
+                    solver.add_clause([var(i, j, grid[i][j], size)])
+        while count < limit and solver.solve():
+            count += 1
+            if not empty:
+                break
+            solution = decode_model(solver.get_model(), size)
+            solver.add_clause([-var(i, j, solution[i][j], size) for i, j in empty])
+    return count
+
+
+# Portfolio: the same puzzle is raced by several configurations in separate
+# processes, each a backend name or a (backend, encoding) pair. The first definite
+# answer (a solution or UNSAT) wins and the other processes are terminated.
+PORTFOLIO = ('glucose3', 'cadical153', 'maplechrono', 'minisat22')
+
+
+def _portfolio_worker(grid, backend, encoding, done):
+    start = perf_counter()
+    solution, info = solve_sudoku_sat(grid, encoding=encoding, backend=backend)
+    done.put((backend, encoding, solution, info, perf_counter() - start))
+
+
+# returns (solution, info) like solve_sudoku_sat, info also names the winning
+# backend / encoding and its solve time; status 'time_limit' when no configuration
+# answered within time_limit seconds. The templates are built here first, so forked
+# workers inherit them; each worker still builds its own solver.
+def solve_sudoku_portfolio(grid, portfolio=PORTFOLIO, time_limit=None):
+    size = len(grid)
+    configs = [(entry, 'pairwise') if isinstance(entry, str) else tuple(entry) for entry in portfolio]
+    for _, encoding in configs:
+        sudoku_template(size, encoding)
+
+    ctx = mp.get_context()
+    done = ctx.Queue()
+    processes = [ctx.Process(target=_portfolio_worker, args=(grid, backend, encoding, done), daemon=True)
+                 for backend, encoding in configs]
+    for process in processes:
+        process.start()
+
+    deadline = perf_counter() + time_limit if time_limit is not None else None
+    solution, info = None, {'status': 'time_limit', 'backend': None, 'encoding': None, 'time': None}
+    try:
+        answered = 0
+        while answered < len(processes):
+            try:
+                backend, encoding, solution, info, elapsed = done.get(timeout=0.05)
+            except Empty:
+                if deadline is not None and perf_counter() > deadline:
+                    break
+                if not any(process.is_alive() for process in processes) and done.empty():
+                    info = {'status': 'failed', 'backend': None, 'encoding': None, 'time': None}
+                    break  # every worker crashed
+                continue
+            answered += 1
+            info.update(backend=backend, encoding=encoding, time=elapsed)
+            if info['status'] in ('solved', 'failed'):
+                break
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+    return solution, info
+
 
+# true literals map straight back to (i, j, n), inverse of var()
+def decode_model(model, size, stats=None):
+    start = perf_counter_ns()
+    solution = [[0]*size for _ in range(size)]
+    for lit in model:
+        if 0 < lit <= size**3:
+            i, rest = divmod(lit - 1, size*size)
+            j, n = divmod(rest, size)
+            solution[i][j] = n+1
+    if stats is not None:
+        stats.add('decode', perf_counter_ns() - start)
+    return solution
 
 
 from sudoku import Sudoku, generate_random_sudoku_grid, pretty_print
@@ -100,12 +366,12 @@ if __name__ == "__main__":
     print("Generated Sudoku Puzzle:")
     pretty_print(puzzle)
 
-    solution, clauses = solve_sudoku_sat(puzzle)
+    solution, info = solve_sudoku_sat(puzzle, record_clauses=True)
     if solution:
         print("\nSudoku solved with SAT:")
         pretty_print(solution)
 
-        for sub_clauses in clauses.values():
+        for sub_clauses in info['clauses'].values():
             print('Number of clauses for rule:', len(sub_clauses))
         
 
@@ -0,0 +1,361 @@
+# service.py
+# Local solve service: an asyncio server on a Unix socket (or localhost TCP) that
+# keeps a pool of warm worker processes, each with the SAT solver for the board
+# sizes already built, and groups incoming puzzles into small batches.
+#
+# Protocol: one JSON object per line in both directions.
+#   request   {"id": 1, "puzzle": "8......", "backend": "sat", "time_limit": 5}
+#   response  {"id": 1, "solution": ..., "status": "solved",
+#              "timing": {"queue_ms": .., "solve_ms": .., "total_ms": ..}}
+# The puzzle is a line or a grid, the solution comes back in the same format, null
+# when there is none. Every solve has a time budget (the service's --time-limit
+# unless the request sets one), status is then 'time_limit'.
+#
+#   python service.py serve --workers 4
+#   python service.py solve 8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..
+#   python service.py load --requests 2000 --concurrency 16
+#
+# Only the standard library is imported here, solver modules are imported when
+# needed, so one-off solves don't pay for numpy / matplotlib.
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+SOCKET_PATH = '/tmp/sudoku-service.sock'
+TIME_LIMIT = 10.0  # seconds per request
+# backends whose requests are grouped into batches; the others are slow enough that
+# each request goes to a worker on its own, so one hard puzzle holds one request
+BATCHED_BACKENDS = ('sat',)
+
+
+# runs once in every worker process: builds the cached SAT solvers up front
+def _warm_worker(sizes):
+    from sat_solver import get_solver
+    for size in sizes:
+        get_solver(size)
+
+
+def _ping(delay):
+    time.sleep(delay)  # keeps the worker busy so the pool starts all the others
+    return os.getpid()
+
+
+# solver kwargs of a request; A* runs on the propagating model, plain Sudoku can
+# spend its whole budget on a hard puzzle
+def _solver_kwargs(backend, time_limit):
+    if backend == 'a_star':
+        from sudoku import PropagatingSudoku
+        return {'problem_cls': PropagatingSudoku, 'time_limit': time_limit}
+    return {'time_limit': time_limit}
+
+
+# (solution, status, solve time, error) per (grid, time_limit); a puzzle that makes
+# the solver raise only fails its own request, the rest of the batch is still answered
+def _solve_batch(requests, backend):
+    from batch import _solve_chunk
+    results = []
+    for grid, time_limit in requests:
+        try:
+            _, solution, metrics = _solve_chunk(0, [grid], backend, _solver_kwargs(backend, time_limit))[0]
+        except Exception as e:
+            results.append((None, 'error', 0.0, f"{type(e).__name__}: {e}"))
+            continue
+        results.append((solution, metrics.get('status', 'solved' if solution else 'failed'), metrics['time'], None))
+    return results
+
+
+# grids sent as JSON get the checks sudoku_parser makes on lines, so a malformed
+# payload is answered with an error instead of reaching a worker
+def _check_grid(grid):
+    size = len(grid) if isinstance(grid, list) else 0
+    block = int(size**0.5)
+    if (block < 2 or block * block != size
+            or any(not isinstance(row, list) or len(row) != size for row in grid)
+            or any(type(num) is not int or not 0 <= num <= size for row in grid for num in row)):
+        raise ValueError(f"not a square sudoku grid: {str(grid)[:40]!r}")
+    return grid
+
+
+class SolveService:
+    def __init__(self, workers=None, batch_size=32, batch_delay=0.002, sizes=(9,), time_limit=TIME_LIMIT):
+        self.workers = workers or os.cpu_count()
+        self.time_limit = time_limit
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.sizes = sizes
+        self.queue = None
+        self.pool = None
+        self.batches = set()  # running batch tasks, the loop only keeps weak references
+        self.served = 0
+
+    async def start(self):
+        from concurrent.futures import ProcessPoolExecutor
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        import batch, sudoku  # imported once here rather than by the first request
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_warm_worker, initargs=(self.sizes,))
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ping, 0.2) for _ in range(self.workers)))
+        self.batcher = asyncio.create_task(self._batcher())
+
+    def close(self):
+        self.batcher.cancel()
+        self.pool.shutdown(cancel_futures=True)
+
+    # waits for a first request, then collects more for at most batch_delay seconds
+    # or until batch_size, and sends one batch per batched backend to the pool
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            by_backend = {}
+            for item in batch:
+                by_backend.setdefault(item['backend'], []).append(item)
+            for backend, items in by_backend.items():
+                groups = [items] if backend in BATCHED_BACKENDS else [[item] for item in items]
+                for group in groups:
+                    task = asyncio.create_task(self._run_batch(backend, group))
+                    self.batches.add(task)
+                    task.add_done_callback(self.batches.discard)
+
+    async def _run_batch(self, backend, items):
+        loop = asyncio.get_running_loop()
+        dispatched = time.perf_counter()
+        try:
+            results = await loop.run_in_executor(self.pool, _solve_batch,
+                                                 [(item['grid'], item['time_limit']) for item in items], backend)
+        except Exception as e:  # a crashed worker fails the whole batch
+            for item in items:
+                item['future'].set_exception(e)
+            return
+        for item, (solution, status, solve_time, error) in zip(items, results):
+            item['future'].set_result((solution, status, dispatched - item['received'], solve_time, error))
+
+    async def solve(self, grid, backend='sat', time_limit=None):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put({'grid': grid, 'backend': backend, 'time_limit': time_limit or self.time_limit,
+                              'future': future, 'received': time.perf_counter()})
+        return await future
+
+    async def _answer(self, line, writer):
+        start = time.perf_counter()
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = request.get('id')
+            backend = request.get('backend', 'sat')
+            from batch import BACKENDS
+            if backend not in BACKENDS:
+                raise ValueError(f"unknown backend: {backend}")
+            time_limit = request.get('time_limit')
+            if time_limit is not None and (type(time_limit) not in (int, float) or time_limit <= 0):
+                raise ValueError(f"time_limit must be a positive number of seconds: {time_limit!r}")
+            puzzle = request['puzzle']
+            as_line = isinstance(puzzle, str)
+            from sudoku import sudoku_parser, sudoku_to_line
+            grid = sudoku_parser(puzzle) if as_line else _check_grid(puzzle)
+        except (ValueError, KeyError, TypeError) as e:
+            response = {'id': request_id, 'error': str(e)}
+        else:
+            try:
+                solution, status, queued, solve_time, error = await self.solve(grid, backend, time_limit)
+            except Exception as e:  # worker pool broken, still answer
+                solution, status, queued, solve_time, error = None, 'error', 0.0, 0.0, f"{type(e).__name__}: {e}"
+            if solution is not None and as_line:
+                solution = sudoku_to_line(solution)
+            response = {'id': request_id, 'solution': solution, 'status': status,
+                        'timing': {'queue_ms': queued * 1e3, 'solve_ms': solve_time * 1e3,
+                                   'total_ms': (time.perf_counter() - start) * 1e3}}
+            if error:
+                response['error'] = error
+        self.served += 1
+        writer.write((json.dumps(response) + '\n').encode())
+        await writer.drain()
+
+    # requests of one connection are answered as they finish, possibly out of order
+    async def handle(self, reader, writer):
+        pending = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._answer(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(socket_path=SOCKET_PATH, port=None, **service_kwargs):
+    service = SolveService(**service_kwargs)
+    await service.start()
+    if port is not None:
+        server = await asyncio.start_server(service.handle, '127.0.0.1', port)
+        where = f"127.0.0.1:{port}"
+    else:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(service.handle, socket_path)
+        where = socket_path
+    print(f"Serving on {where} with {service.workers} warm workers")
+    import signal
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        service.close()
+        if port is None and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+async def connect(socket_path=SOCKET_PATH, port=None):
+    if port is not None:
+        return await asyncio.open_connection('127.0.0.1', port)
+    return await asyncio.open_unix_connection(socket_path)
+
+
+async def request(reader, writer, payload):
+    writer.write((json.dumps(payload) + '\n').encode())
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+# one puzzle: through the service if it is running, otherwise solved in this process
+def solve_one(puzzle, backend='sat', socket_path=SOCKET_PATH, port=None, time_limit=None):
+    async def remote():
+        reader, writer = await connect(socket_path, port)
+        payload = {'id': 0, 'puzzle': puzzle, 'backend': backend}
+        if time_limit is not None:
+            payload['time_limit'] = time_limit
+        try:
+            return await request(reader, writer, payload)
+        finally:
+            writer.close()
+
+    try:
+        return asyncio.run(remote())
+    except (ConnectionError, FileNotFoundError):
+        from sudoku import sudoku_parser, sudoku_to_line
+        solution, status, solve_time, error = _solve_batch([(sudoku_parser(puzzle), time_limit or TIME_LIMIT)], backend)[0]
+        response = {'id': 0, 'solution': sudoku_to_line(solution) if solution else None, 'status': status,
+                    'timing': {'solve_ms': solve_time * 1e3}, 'local': True}
+        if error:
+            response['error'] = error
+        return response
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+# closed-loop load: concurrency connections, each sending its next puzzle as soon as
+# the previous answer arrives; reports latency percentiles and throughput
+async def load(puzzles, concurrency=16, backend='sat', socket_path=SOCKET_PATH, port=None):
+    latencies, solve_ms, failures = [], [], 0
+
+    async def client(share):
+        nonlocal failures
+        reader, writer = await connect(socket_path, port)
+        try:
+            for request_id, puzzle in share:
+                start = time.perf_counter()
+                response = await request(reader, writer, {'id': request_id, 'puzzle': puzzle, 'backend': backend})
+                latencies.append((time.perf_counter() - start) * 1e3)
+                if response.get('solution') is None:
+                    failures += 1
+                else:
+                    solve_ms.append(response['timing']['solve_ms'])
+        finally:
+            writer.close()
+
+    numbered = list(enumerate(puzzles))
+    start = time.perf_counter()
+    await asyncio.gather(*(client(numbered[k::concurrency]) for k in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    report = {'requests': len(latencies), 'failures': failures, 'seconds': elapsed,
+              'throughput': len(latencies) / elapsed if elapsed else 0.0,
+              'p50_ms': percentile(latencies, 50), 'p99_ms': percentile(latencies, 99),
+              'mean_solve_ms': sum(solve_ms) / len(solve_ms) if solve_ms else None}
+    print(f"{report['requests']} requests in {elapsed:.2f}s: {report['throughput']:.0f} req/s, "
+          f"p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, "
+          f"mean solve {report['mean_solve_ms'] or 0:.2f} ms, unsolved {failures}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Sudoku solve service")
+    parser.add_argument('--socket', default=SOCKET_PATH, help='Unix socket path')
+    parser.add_argument('--port', type=int, help='serve / connect on 127.0.0.1:PORT instead of the socket')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve_parser = sub.add_parser('serve', help='run the service')
+    serve_parser.add_argument('--workers', type=int, default=None)
+    serve_parser.add_argument('--batch-size', type=int, default=32)
+    serve_parser.add_argument('--batch-delay', type=float, default=0.002, help='seconds')
+    serve_parser.add_argument('--sizes', type=int, nargs='+', default=[9], help='board sizes to preload')
+    serve_parser.add_argument('--time-limit', type=float, default=TIME_LIMIT, help='default seconds per request')
+    solve_parser = sub.add_parser('solve', help='solve one puzzle line')
+    solve_parser.add_argument('puzzle')
+    solve_parser.add_argument('--backend', default='sat')
+    solve_parser.add_argument('--time-limit', type=float, default=None, help='seconds')
+    load_parser = sub.add_parser('load', help='load-test a running service')
+    load_parser.add_argument('--requests', type=int, default=1000)
+    load_parser.add_argument('--concurrency', type=int, default=16)
+    load_parser.add_argument('--clues', type=int, default=30)
+    load_parser.add_argument('--seed', type=int, default=0)
+    load_parser.add_argument('--backend', default='sat')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args.socket, args.port, workers=args.workers, batch_size=args.batch_size,
+                              batch_delay=args.batch_delay, sizes=tuple(args.sizes),
+                              time_limit=args.time_limit))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == 'solve':
+        response = solve_one(args.puzzle, args.backend, args.socket, args.port, args.time_limit)
+        if response.get('error'):
+            print(response['error'])
+            return 1
+        from sudoku import pretty_print, sudoku_parser
+        if response['solution'] is None:
+            print(f"No solution ({response['status']})")
+        else:
+            pretty_print(sudoku_parser(response['solution']))
+        print(json.dumps(response['timing']))
+        return 0 if response['solution'] is not None else 1
+
+    import random
+    from sudoku import generate_random_sudoku_grid, sudoku_to_line
+    rng = random.Random(args.seed)
+    puzzles = [sudoku_to_line(generate_random_sudoku_grid(num_clues=args.clues, rng=rng)) for _ in range(args.requests)]
+    asyncio.run(load(puzzles, args.concurrency, args.backend, args.socket, args.port))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
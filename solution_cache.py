@@ -0,0 +1,209 @@
+import itertools
+import json
+import os
+from collections import OrderedDict
+
+from sudoku import sudoku_parser, sudoku_to_line
+from sat_solver import solve_sudoku_sat
+
+# Puzzles equivalent under the Sudoku symmetries (transposition, band / stack swaps,
+# row / column swaps inside a band / stack, digit relabeling) share one cache entry.
+# The canonical form orders rows and columns by clue-count invariants, every order
+# of tied rows / bands is tried, and the smallest grid after relabeling digits by
+# first occurrence wins. When ties allow more than MAX_CANDIDATES orders only the
+# first one is used: the key is still a valid transform of the puzzle, but some
+# isomorphic copies may then miss the cache.
+MAX_CANDIDATES = 512
+
+
+def transpose(grid):
+    return [list(col) for col in zip(*grid)]
+
+
+# invariant keys per row and per column: the clue count of the line and the clue
+# counts of the crossing lines it has clues in
+def _line_keys(grid):
+    columns = list(zip(*grid))
+    row_counts = [len(row) - row.count(0) for row in grid]
+    col_counts = [len(col) - col.count(0) for col in columns]
+    row_keys = [(row_counts[i], tuple(sorted(col_counts[j] for j, num in enumerate(row) if num)))
+                for i, row in enumerate(grid)]
+    col_keys = [(col_counts[j], tuple(sorted(row_counts[i] for i, num in enumerate(col) if num)))
+                for j, col in enumerate(columns)]
+    return row_keys, col_keys
+
+
+# orders of items sorted by key where every permutation of equal keys is kept
+def _tied_orders(items, key):
+    items = sorted(items, key=key)
+    keys = [key(item) for item in items]
+    if len(set(keys)) == len(keys):
+        yield items  # no ties, the common case
+        return
+    groups = [list(group) for _, group in itertools.groupby(items, key=key)]
+    for perms in itertools.product(*(itertools.permutations(group) for group in groups)):
+        yield [item for perm in perms for item in perm]
+
+
+# candidate row orders: bands sorted by the keys of their rows, rows sorted inside
+# each band, ties permuted
+def _orders(keys, block):
+    bands = [list(range(b * block, (b + 1) * block)) for b in range(len(keys) // block)]
+    band_key = [tuple(sorted(keys[i] for i in band)) for band in bands]
+    inside = [list(_tied_orders(band, lambda i: keys[i])) for band in bands]
+    orders = []
+    for band_order in _tied_orders(range(len(bands)), lambda b: band_key[b]):
+        for rows in itertools.product(*(inside[b] for b in band_order)):
+            orders.append([i for part in rows for i in part])
+            if len(orders) > MAX_CANDIDATES:
+                return orders[:1]
+    return orders
+
+
+# (canonical grid, transform); transform = (transposed, row order, column order,
+# digit map) takes the puzzle to the canonical grid, see apply_transform
+def canonical_form(grid):
+    size = len(grid)
+    block = int(size**0.5)
+    best, best_transform = None, None
+    row_keys, col_keys = _line_keys(grid)
+    orders = _orders(row_keys, block), _orders(col_keys, block)
+    if len(orders[0]) * len(orders[1]) > MAX_CANDIDATES:
+        orders = orders[0][:1], orders[1][:1]
+    # the transposed grid swaps the roles of rows and columns
+    for transposed in (False, True):
+        g = transpose(grid) if transposed else grid
+        row_orders, col_orders = (orders[1], orders[0]) if transposed else orders
+        for rows in row_orders:
+            for cols in col_orders:
+                relabel = {}
+                cells = []
+                for i in rows:
+                    row = g[i]
+                    for j in cols:
+                        num = row[j]
+                        if num and num not in relabel:
+                            relabel[num] = len(relabel) + 1
+                        cells.append(relabel[num] if num else 0)
+                cells = bytes(cells)
+                if best is None or cells < best:
+                    best, best_transform = cells, (transposed, rows, cols, relabel)
+
+    # digits missing from the clues take the remaining labels in order
+    transposed, rows, cols, relabel = best_transform
+    missing = [num for num in range(1, size + 1) if num not in relabel]
+    for num in missing:
+        relabel[num] = len(relabel) + 1
+    canonical = [list(best[i*size:(i+1)*size]) for i in range(size)]
+    return canonical, best_transform
+
+
+def apply_transform(grid, transform):
+    transposed, rows, cols, relabel = transform
+    g = transpose(grid) if transposed else grid
+    return [[relabel[g[i][j]] if g[i][j] else 0 for j in cols] for i in rows]
+
+
+def invert_transform(grid, transform):
+    transposed, rows, cols, relabel = transform
+    inverse = {label: num for num, label in relabel.items()}
+    size = len(grid)
+    out = [[0] * size for _ in range(size)]
+    for a, i in enumerate(rows):
+        for b, j in enumerate(cols):
+            out[i][j] = inverse[grid[a][b]] if grid[a][b] else 0
+    return transpose(out) if transposed else out
+
+
+# a random symmetric copy of grid, the repeated traffic the cache is meant for
+def random_symmetry(grid, rng):
+    size = len(grid)
+    block = int(size**0.5)
+
+    def axis_order():
+        bands = list(range(size // block))
+        rng.shuffle(bands)
+        order = []
+        for b in bands:
+            rows = list(range(b * block, (b + 1) * block))
+            rng.shuffle(rows)
+            order += rows
+        return order
+
+    labels = list(range(1, size + 1))
+    rng.shuffle(labels)
+    relabel = {num: labels[num - 1] for num in range(1, size + 1)}
+    return apply_transform(grid, (rng.random() < 0.5, axis_order(), axis_order(), relabel))
+
+
+def sat_solution(grid):
+    return solve_sudoku_sat(grid)[0]
+
+
+# bounded LRU cache of solutions keyed by canonical form; unsolvable puzzles are
+# cached too (as None). path: optional JSON file loaded on creation and written by save()
+class SolutionCache:
+    def __init__(self, max_entries=10000, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()  # canonical puzzle bytes -> canonical solution bytes or None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    # solution of grid from the cache, or from solver(grid) (SAT by default) on a miss
+    def solve(self, grid, solver=sat_solution):
+        canonical, transform = canonical_form(grid)
+        key = bytes(num for row in canonical for num in row)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            solution = self.entries[key]
+            if solution is None:
+                return None
+            return invert_transform(_grid(solution, len(grid)), transform)
+
+        self.misses += 1
+        solution = solver(grid)
+        self._store(key, bytes(num for row in apply_transform(solution, transform) for num in row)
+                    if solution is not None else None)
+        return solution
+
+    def _store(self, key, solution):
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    # entries are written least recently used first, as puzzle / solution lines
+    def save(self, path=None):
+        entries = []
+        for key, solution in self.entries.items():
+            size = int(len(key)**0.5)
+            entries.append([sudoku_to_line(_grid(key, size)),
+                            sudoku_to_line(_grid(solution, size)) if solution is not None else None])
+        with open(path or self.path, 'w') as f:
+            json.dump({'entries': entries}, f)
+        return len(entries)
+
+    def load(self, path):
+        with open(path) as f:
+            entries = json.load(f)['entries']
+        for puzzle, solution in entries:
+            key = bytes(num for row in sudoku_parser(puzzle) for num in row)
+            self._store(key, bytes(num for row in sudoku_parser(solution) for num in row) if solution is not None else None)
+
+
+def _grid(cells, size):
+    return [list(cells[i*size:(i+1)*size]) for i in range(size)]
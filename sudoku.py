@@ -1,8 +1,17 @@
+# cell symbols of the compact one-char-per-cell format, digit n is DIGITS[n-1]
+DIGITS = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
 class Sudoku:
-    def __init__(self, grid, size=9, block=3):
+    # size and block default to the grid's own: size x size cells, block = sqrt(size)
+    def __init__(self, grid, size=None, block=None):
         self.initial_state = grid
-        self.size = size
-        self.block = block 
+        self.size = size or len(grid)
+        self.block = block or int(self.size**0.5)
+        # actions only place valid digits, so once the clues are consistent the
+        # goal is reached exactly when every empty cell got one placement
+        self.consistent = self.units_unique(grid)
+        self.initial_empty = sum(row.count(0) for row in grid)
 
     def get_actions(self, state):
         actions = []
@@ -26,14 +35,19 @@ class Sudoku:
         for row in state: # must contain no zeroes
             if 0 in row:
                 return False
-    
+        return self.units_unique(state)
+
+    def is_goal_node(self, node):
+        return self.consistent and node.g == self.initial_empty
+
+    def units_unique(self, state):
         for i in range(self.size):
             if not self.is_unique(state[i]):  # rows
                 return False
         for j in range(self.size):
             if not self.is_unique([state[i][j] for i in range(self.size)]):  # cols
                 return False
-        # blocks 3x3
+        # blocks block x block
         for bi in range(0, self.size, self.block):
             for bj in range(0, self.size, self.block):
                 block = [state[i][j] for i in range(bi, bi+self.block) for j in range(bj, bj+self.block)]
@@ -63,83 +77,416 @@ class Sudoku:
 
     def state_to_hashable(self, state):
         return tuple(tuple(row) for row in state)
-    
 
-def generate_random_sudoku_grid(size=9, block=3, num_clues=30):
-    import random
-    def fill_grid(grid):
+    def to_grid(self, state):
+        return state
+
+
+# compact state: the grid packed in bytes (also the hash key) plus a digit bitmask
+# per row, column and box, bit n is set when digit n is already placed in that unit
+class PackedState:
+    __slots__ = ('cells', 'rows', 'cols', 'boxes', 'empty', 'size')
+
+    def __init__(self, cells, rows, cols, boxes, empty, size):
+        self.cells = cells
+        self.rows = rows
+        self.cols = cols
+        self.boxes = boxes
+        self.empty = empty
+        self.size = size
+
+    def __iter__(self): # rows as bytes, so count-based heuristics work unchanged
+        n = self.size
+        for i in range(n):
+            yield self.cells[i*n:(i+1)*n]
+
+
+class BitmaskSudoku(Sudoku):
+    def __init__(self, grid, size=None, block=None):
+        super().__init__(grid, size, block)
+        size, block = self.size, self.block
+        self.full_mask = ((1 << size) - 1) << 1  # bits 1..size
+        self.box_of = [(i // block) * block + j // block for i in range(size) for j in range(size)]
+        self.consistent = True
+
+        cells = bytearray(size * size)
+        rows, cols, boxes = [0] * size, [0] * size, [0] * size
         for i in range(size):
             for j in range(size):
-                if grid[i][j] == 0:
-                    nums = list(range(1, size + 1))
-                    random.shuffle(nums)
-                    for num in nums:
-                        if Sudoku(grid).is_valid(grid, i, j, num):
-                            grid[i][j] = num
-                            if fill_grid(grid):
-                                return True
-                            grid[i][j] = 0
+                num = grid[i][j]
+                if num == 0:
+                    continue
+                bit = 1 << num
+                b = self.box_of[i*size + j]
+                if (rows[i] | cols[j] | boxes[b]) & bit:
+                    self.consistent = False  # clashing clues, no goal is reachable
+                rows[i] |= bit
+                cols[j] |= bit
+                boxes[b] |= bit
+                cells[i*size + j] = num
+        self.initial_state = PackedState(bytes(cells), rows, cols, boxes, cells.count(0), size)
+
+    def candidates(self, state, idx):
+        i, j = divmod(idx, self.size)
+        return self.full_mask & ~(state.rows[i] | state.cols[j] | state.boxes[self.box_of[idx]])
+
+    def get_actions(self, state):
+        idx = state.cells.find(0)  # first empty cell, row-major like Sudoku
+        if idx < 0:
+            return []
+        i, j = divmod(idx, self.size)
+        mask = self.candidates(state, idx)
+        return [(i, j, num) for num in range(1, self.size + 1) if mask >> num & 1]
+
+    def apply_action(self, state, action):
+        # only the touched unit masks change, the packed grid is copied once
+        i, j, num = action
+        idx = i*self.size + j
+        bit = 1 << num
+        b = self.box_of[idx]
+        cells = bytearray(state.cells)
+        cells[idx] = num
+        rows, cols, boxes = state.rows[:], state.cols[:], state.boxes[:]
+        rows[i] |= bit
+        cols[j] |= bit
+        boxes[b] |= bit
+        return PackedState(bytes(cells), rows, cols, boxes, state.empty - 1, self.size)
+
+    def is_goal(self, state):
+        # placements only come from get_actions, so a full grid built from
+        # consistent clues is a valid solution
+        return state.empty == 0 and self.consistent
+
+    def is_goal_node(self, node):
+        return self.is_goal(node.state)
+
+    def state_to_hashable(self, state):
+        return state.cells
+
+    def to_grid(self, state):
+        return [list(row) for row in state]
+    
+
+# branches on the minimum-remaining-values cell and propagates naked and hidden
+# singles after every placement, apply_action returns None on a contradiction
+class PropagatingSudoku(BitmaskSudoku):
+    def __init__(self, grid, size=None, block=None):
+        super().__init__(grid, size, block)
+        size, block = self.size, self.block
+        n = size
+        rows = [[i*n + j for j in range(n)] for i in range(n)]
+        cols = [[i*n + j for i in range(n)] for j in range(n)]
+        boxes = [[(bi + i)*n + bj + j for i in range(block) for j in range(block)]
+                 for bi in range(0, n, block) for bj in range(0, n, block)]
+        self.units = rows + cols + boxes
+
+        if self.consistent:
+            state = self.initial_state
+            work = (bytearray(state.cells), state.rows[:], state.cols[:], state.boxes[:])
+            if self.propagate(*work):
+                cells = work[0]
+                self.initial_state = PackedState(bytes(cells), work[1], work[2], work[3], cells.count(0), size)
+            else:
+                self.consistent = False
+
+    def get_actions(self, state):
+        if not self.consistent:
+            return []
+        best_idx, best_mask, best_count = -1, 0, self.size + 1
+        for idx in range(self.size * self.size):
+            if state.cells[idx]:
+                continue
+            mask = self.candidates(state, idx)
+            count = bin(mask).count("1")
+            if count < best_count:
+                best_idx, best_mask, best_count = idx, mask, count
+                if count <= 1:
+                    break
+        if best_idx < 0:
+            return []
+        i, j = divmod(best_idx, self.size)
+        return [(i, j, num) for num in range(1, self.size + 1) if best_mask >> num & 1]
+
+    def apply_action(self, state, action):
+        i, j, num = action
+        cells = bytearray(state.cells)
+        rows, cols, boxes = state.rows[:], state.cols[:], state.boxes[:]
+        self.place(cells, rows, cols, boxes, i*self.size + j, num)
+        if not self.propagate(cells, rows, cols, boxes):
+            return None  # dead end, pruned before reaching the frontier
+        return PackedState(bytes(cells), rows, cols, boxes, cells.count(0), self.size)
+
+    def place(self, cells, rows, cols, boxes, idx, num):
+        i, j = divmod(idx, self.size)
+        bit = 1 << num
+        cells[idx] = num
+        rows[i] |= bit
+        cols[j] |= bit
+        boxes[self.box_of[idx]] |= bit
+
+    def propagate(self, cells, rows, cols, boxes):
+        # naked and hidden singles until nothing changes, False on a contradiction
+        n = self.size
+        full = self.full_mask
+        box_of = self.box_of
+        changed = True
+        while changed:
+            changed = False
+            # naked singles: a cell with one candidate left
+            for idx in range(n * n):
+                if cells[idx]:
+                    continue
+                i, j = divmod(idx, n)
+                mask = full & ~(rows[i] | cols[j] | boxes[box_of[idx]])
+                if not mask:
                     return False
+                if mask & (mask - 1) == 0:
+                    self.place(cells, rows, cols, boxes, idx, mask.bit_length() - 1)
+                    changed = True
+            # hidden singles: a digit with one possible cell left in a unit
+            for unit in self.units:
+                once, twice, placed = 0, 0, 0
+                for idx in unit:
+                    if cells[idx]:
+                        placed |= 1 << cells[idx]
+                        continue
+                    i, j = divmod(idx, n)
+                    mask = full & ~(rows[i] | cols[j] | boxes[box_of[idx]])
+                    twice |= once & mask
+                    once |= mask
+                if (once | placed) != full:
+                    return False  # some digit has no place left in this unit
+                singles = once & ~twice & ~placed
+                while singles:
+                    bit = singles & -singles
+                    singles ^= bit
+                    for idx in unit:
+                        if cells[idx]:
+                            continue
+                        i, j = divmod(idx, n)
+                        if full & ~(rows[i] | cols[j] | boxes[box_of[idx]]) & bit:
+                            self.place(cells, rows, cols, boxes, idx, bit.bit_length() - 1)
+                            break
+                    else:
+                        return False  # the single was taken by another placement
+                    changed = True
         return True
 
-    grid = [[0]*size for _ in range(size)]
-    fill_grid(grid)
+
+# rng: optional random.Random for reproducible puzzles, the global generator otherwise
+# the full grid comes from the randomized bitmask backtracker, with restarts: 16x16
+# boards take milliseconds, 25x25 ones typically 0.3-1s but up to a few seconds
+def generate_random_sudoku_grid(size=9, block=None, num_clues=30, rng=None):
+    import random
+    block = block or int(size**0.5)
+    rng = random if rng is None else rng
+    cells = _random_full_grid(size, block, rng)
+    grid = [cells[i*size:(i+1)*size] for i in range(size)]
 
     # Remove numbers to create clues
     cells = [(i, j) for i in range(size) for j in range(size)]
-    random.shuffle(cells)
+    rng.shuffle(cells)
     for i, j in cells[:size*size - num_clues]:
         grid[i][j] = 0
 
     return grid
 
 
+# backtracking over a flat cell list with row/column/box bitmasks, always branching
+# on the cell with the fewest candidates (rng shuffles the digit order). Stops once
+# limit solutions are found and then leaves cells holding the last one, otherwise
+# cells are restored. Returns the number of solutions found, or None when the search
+# gave up after max_nodes placements (cells are then left partly filled).
+def _solve_bitmask(cells, size, block, limit, rng=None, max_nodes=None):
+    box_of = [(idx // size // block) * block + idx % size // block for idx in range(size * size)]
+    rows, cols, boxes = [0] * size, [0] * size, [0] * size
+    for idx, num in enumerate(cells):
+        if num:
+            bit = 1 << num
+            i, j, b = idx // size, idx % size, box_of[idx]
+            if (rows[i] | cols[j] | boxes[b]) & bit:
+                return 0  # clashing clues
+            rows[i] |= bit
+            cols[j] |= bit
+            boxes[b] |= bit
+    empties = [idx for idx, num in enumerate(cells) if num == 0]
+    full = ((1 << size) - 1) << 1
+    count = 0
+    nodes = 0
+
+    def search():
+        nonlocal count, nodes
+        best, best_mask, best_count = -1, 0, size + 1
+        for idx in empties:
+            if cells[idx]:
+                continue
+            mask = full & ~(rows[idx // size] | cols[idx % size] | boxes[box_of[idx]])
+            n = bin(mask).count("1")
+            if n < best_count:
+                best, best_mask, best_count = idx, mask, n
+                if n <= 1:
+                    break
+        if best < 0:
+            count += 1
+            return count >= limit
+        if best_count == 0:
+            return False
+
+        nums = [num for num in range(1, size + 1) if best_mask >> num & 1]
+        if rng is not None:
+            rng.shuffle(nums)
+        i, j, b = best // size, best % size, box_of[best]
+        for num in nums:
+            nodes += 1
+            if max_nodes is not None and nodes > max_nodes:
+                return True
+            bit = 1 << num
+            cells[best] = num
+            rows[i] |= bit
+            cols[j] |= bit
+            boxes[b] |= bit
+            if search():
+                return True
+            rows[i] ^= bit
+            cols[j] ^= bit
+            boxes[b] ^= bit
+        cells[best] = 0
+        return False
+
+    search()
+    if max_nodes is not None and nodes > max_nodes:
+        return None
+    return count
+
+
+# a random complete grid; random fills of large boards have heavy-tailed run times,
+# so the search restarts with a fresh digit order when it stalls
+def _random_full_grid(size, block, rng):
+    while True:
+        cells = [0] * (size * size)
+        if _solve_bitmask(cells, size, block, 1, rng, max_nodes=4 * size * size):
+            return cells
+
+
+# number of solutions of grid, counting stops at limit (limit=2 is a uniqueness
+# check); method is 'backtrack' (bitmask search) or 'sat' (blocking clauses)
+def count_solutions(grid, limit=2, method='backtrack'):
+    size = len(grid)
+    block = int(size**0.5)
+    if method == 'backtrack':
+        return _solve_bitmask([cell for row in grid for cell in row], size, block, limit)
+    if method == 'sat':
+        from sat_solver import count_solutions_sat
+        return count_solutions_sat(grid, limit)
+    raise ValueError(f"unknown counting method: {method}")
+
+
+# puzzles with a unique solution: a random full grid, then clues are removed in
+# random order only while the early-stopping counter still finds one solution.
+# Stops at num_clues, or earlier (with more clues) once no clue can be removed.
+def generate_unique_sudoku_grid(size=9, block=None, num_clues=30, rng=None):
+    import random
+    block = block or int(size**0.5)
+    rng = random if rng is None else rng
+    cells = _random_full_grid(size, block, rng)
+
+    order = list(range(size * size))
+    rng.shuffle(order)
+    clues = size * size
+    for idx in order:
+        if clues <= num_clues:
+            break
+        num, cells[idx] = cells[idx], 0
+        if _solve_bitmask(cells[:], size, block, 2) == 1:
+            clues -= 1
+        else:
+            cells[idx] = num
+    return [cells[i*size:(i+1)*size] for i in range(size)]
+
+
+def _generate_indexed(args):
+    import random
+    index, seed, size, block, num_clues = args
+    return generate_unique_sudoku_grid(size, block, num_clues, random.Random(f"{seed}:{index}"))
+
+
+# n unique-solution puzzles, puzzle k only depends on (seed, k) so the set is the
+# same whatever the number of worker processes
+def generate_many(n, size=9, block=None, num_clues=30, seed=0, workers=None):
+    block = block or int(size**0.5)
+    tasks = [(index, seed, size, block, num_clues) for index in range(n)]
+    if workers is None:
+        return [_generate_indexed(task) for task in tasks]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_generate_indexed, tasks, chunksize=max(1, n // (4 * workers))))
+
+
+# any size: cells are right-aligned to the widest number, '.' for empty cells
 def pretty_print(grid):
-    for k in range(len(grid)):
+    size = len(grid)
+    block = int(size**0.5)
+    width = len(str(size))
+    band = " ".join(["-" * width] * block)
+    for k in range(size):
         row = grid[k]
-        if k % 3 == 0 and k != 0:
-            print("- - - + - - - + - - -")
-        for i in range(len(row)):
-            if i % 3 == 0 and i != 0 and i != len(row):
-                print("|", end=" ")
-            if i == len(row) - 1:
-                if row[i]!= 0: print(row[i]) 
-                else: print(".")
-            else:
-                if row[i]!= 0: print(row[i], end=" ") 
-                else: print(".", end=" ")
+        if k % block == 0 and k != 0:
+            print(" + ".join([band] * (size // block)))
+        cells = [str(num).rjust(width) if num != 0 else ".".rjust(width) for num in row]
+        print(" | ".join(" ".join(cells[b:b + block]) for b in range(0, size, block)))
 
 
 def check_solution(grid):
     sudoku = Sudoku(grid)
     return sudoku.is_goal(grid)
 
-import requests
+def _cell_value(token):
+    if token in ('.', '0'):
+        return 0
+    if token.isdigit():
+        return int(token)
+    if len(token) == 1 and token.upper() in DIGITS:
+        return DIGITS.index(token.upper()) + 1
+    raise ValueError(f"not a sudoku cell: {token!r}")
 
+# reads a puzzle of any square size from one line, in either format:
+#  - compact, one char per cell: '.' or '0' for empty cells, then 1-9 and A-Z
+#    (81 chars for 9x9, 256 for 16x16 with 1-9A-G, ...)
+#  - numbers separated by whitespace or commas, '.' or '0' for empty cells
+# raises ValueError if the line is not a square grid of a square size
 def sudoku_parser(line):
-    grid = []
-    for i in range(9):
-        row = []
-        for j in range(9):
-            char = line[i*9 + j]
-            if char == '.':
-                row.append(0)
-            else:
-                row.append(int(char))
-        grid.append(row)
-    return grid
+    tokens = line.replace(',', ' ').split()
+    if len(tokens) == 1:
+        tokens = tokens[0]
+    values = [_cell_value(t) for t in tokens]
+    size = int(len(values)**0.5)
+    block = int(size**0.5)
+    if block < 2 or size*size != len(values) or block*block != size or max(values) > size:
+        raise ValueError(f"not a square sudoku grid: {line[:40]!r}")
+    return [values[i*size:(i+1)*size] for i in range(size)]
+
+# inverse of sudoku_parser: compact form up to 35x35, numbers separated by spaces otherwise
+def sudoku_to_line(grid):
+    cells = [num for row in grid for num in row]
+    if len(grid) <= len(DIGITS):
+        return "".join(DIGITS[num - 1] if num else "." for num in cells)
+    return " ".join(str(num) if num else "." for num in cells)
+
+# yields the puzzles found in an iterable of lines (any format sudoku_parser reads),
+# other lines are skipped
+def parse_sudoku_lines(lines):
+    for line in lines:
+        try:
+            yield sudoku_parser(line)
+        except ValueError:
+            continue
 
 def get_sudokus_from_web(url):
-    sudokus = []
+    import requests  # only needed when downloading, local corpora work offline
     resp = requests.get(url)
     text = resp.text
     print('Parsing web page...')
-    for line in text.splitlines():
-        line = line.strip()
-        if len(line) == 81 and all(c.isdigit() or c == '.' for c in line):
-            grid = sudoku_parser(line)
-            sudokus.append(grid)
-    return sudokus
+    return list(parse_sudoku_lines(text.splitlines()))
 
 if __name__ == "__main__":
     url = "http://magictour.free.fr/top2365"
@@ -1,100 +1,432 @@
 # tester.py
 import os
+import json
 import time
+import random
+import functools
+import multiprocessing as mp
+from multiprocessing.connection import wait
 import numpy as np
 import matplotlib.pyplot as plt
 
-from sudoku import Sudoku, generate_random_sudoku_grid, get_sudokus_from_web
-from a_star import a_star, heuristic
-from sat_solver import solve_sudoku_sat  # supponiamo ritorni anche clausole
+from sudoku import Sudoku, PropagatingSudoku, generate_random_sudoku_grid, count_solutions
+from corpus import load_sudokus
+from a_star import a_star, heuristic, STRATEGIES
+from sat_solver import solve_sudoku_sat, solve_sudoku_portfolio, SAT_BACKENDS  # (solution, info), info ha i conteggi di clausole e variabili
+from dlx import solve_sudoku_dlx
+from grid_utils import validate_grids
 
 # Assicuriamoci che la cartella results esista
 os.makedirs("results", exist_ok=True)
 
 NUM_TESTS = 50
 CLUES_LIST = [20, 45, 70]
+# scaling sweep over board sizes, SIZE_CLUE_FRACTION of the cells are given
+SIZES_LIST = [9, 16, 25]
+SIZE_CLUE_FRACTION = 0.5
+# plain A* cannot finish large boards, in the size sweep it runs on the propagating
+# model and every backend that supports it gets the same time budget (seconds)
+SIZE_TIME_LIMIT = 60
+SIZE_RUNNER_KWARGS = {
+    'a_star': {'problem_cls': PropagatingSudoku, 'time_limit': SIZE_TIME_LIMIT},
+    'sat': {'time_limit': SIZE_TIME_LIMIT},
+    'dlx': {},
+}
+# statuses of runs stopped by a limit rather than a proven failure
+BUDGET_STATUSES = ('iteration_limit', 'time_limit', 'memory_limit', 'budget_limit')
 
 # Funzione helper per misurare tempo e metriche A*
-def run_a_star(puzzle):
-    env = Sudoku(puzzle)
+# search can be a_star or one of the memory-bounded ida_star / sma_star, search_kwargs
+# can set budgets (e.g. time_limit=10, max_memory=2**30) and the a_star strategy
+# (e.g. strategy='weighted', weight=3 or strategy='beam', beam_width=50)
+def run_a_star(puzzle, problem_cls=Sudoku, search=a_star, **search_kwargs):
+    env = problem_cls(puzzle)
     metrics = {}
     start = time.time()
-    solution, metrics = a_star(env, heuristic, verbose=False)
+    solution, metrics = search(env, heuristic, verbose=False, **search_kwargs)
     end = time.time()
     metrics['time'] = end - start
     if solution:
         metrics['steps'] = len(solution)-1
-        metrics['solution'] = solution[-1]
+        metrics['solution'] = env.to_grid(solution[-1])
         metrics['nodes_generated'] = metrics['nodes_generated']
         metrics['nodes_expanded'] = metrics['nodes_expanded']
         metrics['max_frontier_size'] = metrics['max_frontier_size']
     else:
+        # counts reached before the search stopped, kept apart from the solved runs
+        metrics['partial'] = {key: metrics[key] for key in ('nodes_generated', 'nodes_expanded', 'max_frontier_size')}
         metrics['steps'] = None
         metrics['nodes_generated'] = None
         metrics['nodes_expanded'] = None
         metrics['max_frontier_size'] = None
     return metrics
 
-# SAT runner
-def run_sat(puzzle):
+# SAT runner, sat_kwargs pick the encoding (e.g. encoding='commander', reduce=True)
+# and budgets (conflict_budget, propagation_budget, time_limit)
+def run_sat(puzzle, **sat_kwargs):
     metrics = {}
     start = time.time()
-    solution, clauses = solve_sudoku_sat(puzzle)
+    solution, info = solve_sudoku_sat(puzzle, **sat_kwargs)
     end = time.time()
     metrics['time'] = end - start
-    if solution:
-        # clauses vars
-        num_clauses = sum(len(sub_clauses) for sub_clauses in clauses.values())
-        metrics['clauses'] = num_clauses
-        
-        # variables
-        all_vars = set()
-        for sub_clauses in clauses.values():
-            for clause in sub_clauses:
-                all_vars.update(abs(lit) for lit in clause)
-        num_vars = len(all_vars)
-        metrics['variables'] = num_vars
-
-        # clause to var ratio
-        metrics['clause_to_var_ratio'] = num_clauses / num_vars if num_vars > 0 else None
-
-        metrics['solution'] = solution
-    else:
-        metrics['clauses'] = None
-        metrics['variables'] = None
-        metrics['clause_to_var_ratio'] = None
-        metrics['solution'] = None
+    metrics['status'] = info['status']
+    # clauses and variables, counted by the encoder; kept for unsolved runs too
+    # (partial metrics when a budget stopped the solver)
+    num_clauses = info['num_clauses']
+    metrics['clauses'] = num_clauses
+    num_vars = info['num_variables']
+    metrics['variables'] = num_vars
+
+    # clause to var ratio
+    metrics['clause_to_var_ratio'] = num_clauses / num_vars if num_vars > 0 else None
+
+    metrics['solution'] = solution
+    return metrics
+
+# SAT portfolio runner: backends race in separate processes, the winner is recorded
+def run_portfolio(puzzle, **portfolio_kwargs):
+    metrics = {}
+    start = time.time()
+    solution, info = solve_sudoku_portfolio(puzzle, **portfolio_kwargs)
+    end = time.time()
+    metrics['time'] = end - start
+    metrics['status'] = info['status']
+    metrics['solution'] = solution
+    metrics['winner'] = info['backend']
     return metrics
 
+# DLX (exact cover) runner
+def run_dlx(puzzle):
+    metrics = {}
+    start = time.time()
+    solution, info = solve_sudoku_dlx(puzzle)
+    end = time.time()
+    metrics['time'] = end - start
+    metrics['solution'] = solution
+    metrics['status'] = 'solved' if solution else 'failed'
+    # search nodes and link updates, the exact cover work
+    metrics['dlx_nodes'] = info['nodes'] if solution else None
+    metrics['dlx_updates'] = info['updates'] if solution else None
+    return metrics
+
+# Results file: one JSON line per run, written as soon as the run finishes, with
+# seed, num_clues, index and backend next to the metrics. A run that crashed can be
+# restarted with the same file, the (seed, size, num_clues, index, backend) keys
+# already in it are skipped.
+
+def result_key(record):
+    return record['seed'], record['size'], record['num_clues'], record['index'], record['backend']
+
+def iter_results(path):
+    with open(path) as f:
+        for line in f:
+            if line.endswith('\n'):  # a line cut by a crash is ignored
+                record = json.loads(line)
+                record.setdefault('size', 9)  # written before the size sweep
+                yield record
+
+# keys already in the results file; a last line cut by a crash is dropped so the
+# next append starts on a clean line
+def completed_keys(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+    return {result_key(record) for record in iter_results(path)}
+
+def append_result(path, seed, num_clues, index, backend, metrics, size=9):
+    record = {'seed': seed, 'size': size, 'num_clues': num_clues, 'index': index, 'backend': backend, **metrics}
+    with open(path, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+
+# rebuilds the in-memory results dict from a results file, grouped by group
+# ('num_clues' or 'size')
+def load_results(path, group='num_clues'):
+    results = {}
+    for record in iter_results(path):
+        results.setdefault(record[group], {backend: [] for backend in RUNNERS})[record['backend']].append(record)
+    return results
+
+# yields (group value, backend, metrics) from a results dict or a results file
+def iter_runs(results, group='num_clues'):
+    if isinstance(results, str):
+        for record in iter_results(results):
+            yield record[group], record['backend'], record
+        return
+    for num_clues, algos in results.items():
+        for backend, runs in algos.items():
+            for r in runs:
+                if r is not None:
+                    yield num_clues, backend, r
+
+# running mean / std of the given metrics per (num_clues, backend), plus solved,
+# unsolved and budget-exceeded counts, one run at a time (Welford)
+def aggregate_results(results, metrics, group='num_clues'):
+    agg = {}
+    for num_clues, backend, r in iter_runs(results, group):
+        entry = agg.setdefault(num_clues, {}).setdefault(backend, {
+            'solved': 0, 'unsolved': 0, 'budget': 0, 'metrics': {m: [0, 0.0, 0.0] for m in metrics}})
+        if r.get('solution') is not None:
+            entry['solved'] += 1
+        else:
+            entry['unsolved'] += 1
+            entry['budget'] += r.get('status') in BUDGET_STATUSES
+        for metric in metrics:
+            value = r.get(metric)
+            if value is not None:
+                acc = entry['metrics'][metric]
+                acc[0] += 1
+                delta = value - acc[1]
+                acc[1] += delta / acc[0]
+                acc[2] += delta * (value - acc[1])
+    return agg
+
+# (mean, std) of a metric from aggregate_results, missing when there are no values
+def metric_stats(agg, num_clues, backend, metric, missing=np.nan):
+    entry = agg.get(num_clues, {}).get(backend)
+    if entry is None or entry['metrics'][metric][0] == 0:
+        return missing, missing
+    n, mean, m2 = entry['metrics'][metric]
+    return mean, (m2 / n) ** 0.5
+
 # Main loop
 
-def my_test(num_test=50):
+# with results_path the runs are appended to that file instead of kept in memory,
+# runs already in it are skipped, and the path is returned. A resumed run must draw
+# the same puzzles, so results_path needs a seed
+def my_test(num_test=50, seed=None, results_path=None):
+    if results_path and seed is None:
+        raise ValueError("my_test with results_path needs a seed, unseeded puzzles can't be resumed")
     results = {}
+    done = completed_keys(results_path) if results_path else set()
+    warm_sat()
     for num_clues in CLUES_LIST:
-        results[num_clues] = {'a_star':[], 'sat':[]}
+        results[num_clues] = {'a_star':[], 'sat':[], 'dlx':[]}
         print(f"Running tests for num_clues={num_clues}...")
         for _ in range(num_test):
-            puzzle = generate_random_sudoku_grid(num_clues=num_clues)
-            
-            # A*
-            a_star_metrics = run_a_star(puzzle)
-            results[num_clues]['a_star'].append(a_star_metrics)
-            
-            # SAT
-            sat_metrics = run_sat(puzzle)
-            results[num_clues]['sat'].append(sat_metrics)
-            print(f"Test completed for iteration {_}: A* time: {a_star_metrics['time']:.4f}s; SAT time: {sat_metrics['time']:.4f}s")
+            todo = [backend for backend in RUNNERS if (seed, 9, num_clues, _, backend) not in done]
+            if not todo:
+                continue
+            if seed is None:
+                puzzle = generate_random_sudoku_grid(num_clues=num_clues)
+            else:
+                puzzle = seeded_puzzle(seed, num_clues, _)
+
+            times = []
+            for backend in todo:
+                metrics = RUNNERS[backend](puzzle)
+                if results_path:
+                    append_result(results_path, seed, num_clues, _, backend, metrics)
+                else:
+                    results[num_clues][backend].append(metrics)
+                times.append(f"{backend} time: {metrics['time']:.4f}s")
+            print(f"Test completed for iteration {_}: " + "; ".join(times))
+    return results_path or results
+
+
+# scaling sweep: the backends on growing boards, results are grouped by size
+# (group='size' in the plots and the summary table); results_path as in my_test
+def my_test_sizes(num_test=10, seed=0, results_path=None):
+    results = {}
+    done = completed_keys(results_path) if results_path else set()
+    for size in SIZES_LIST:
+        num_clues = round(SIZE_CLUE_FRACTION * size * size)
+        results[size] = {backend: [] for backend in RUNNERS}
+        print(f"Running tests for size={size} ({num_clues} clues)...")
+        warm_sat(size)
+        for idx in range(num_test):
+            todo = [backend for backend in RUNNERS if (seed, size, num_clues, idx, backend) not in done]
+            if not todo:
+                continue
+            puzzle = seeded_puzzle(seed, num_clues, idx, size)
+
+            times = []
+            for backend in todo:
+                metrics = RUNNERS[backend](puzzle, **SIZE_RUNNER_KWARGS[backend])
+                if results_path:
+                    append_result(results_path, seed, num_clues, idx, backend, metrics, size)
+                else:
+                    results[size][backend].append(metrics)
+                times.append(f"{backend} time: {metrics['time']:.4f}s")
+            print(f"Test completed for size={size}, iteration {idx}: " + "; ".join(times))
+    return results_path or results
+
+
+# times count_solutions with every method on the same puzzles
+def benchmark_count_solutions(puzzles, limit=2, methods=('backtrack', 'sat')):
+    results = {method: [] for method in methods}
+    for puzzle in puzzles:
+        for method in methods:
+            start = time.time()
+            count = count_solutions(puzzle, limit, method)
+            results[method].append({'time': time.time() - start, 'solutions': count})
+    for method, runs in results.items():
+        print(f"{method}: mean time {np.mean([r['time'] for r in runs]):.4f}s, "
+              f"unique {sum(1 for r in runs if r['solutions'] == 1)}/{len(runs)}")
     return results
 
+# every SAT backend on the same puzzles, to pick the fastest default for a puzzle mix.
+# Each backend first solves one puzzle untimed, so building its solver is not counted;
+# with portfolio=True the process-racing portfolio is timed as one more entry
+def compare_sat_backends(puzzles, backends=SAT_BACKENDS, portfolio=False, **sat_kwargs):
+    results = {backend: [] for backend in backends}
+    for backend in backends:
+        solve_sudoku_sat(puzzles[0], backend=backend)
+        for puzzle in puzzles:
+            results[backend].append(run_sat(puzzle, backend=backend, **sat_kwargs))
+    if portfolio:
+        results['portfolio'] = [run_portfolio(puzzle) for puzzle in puzzles]
+    for backend, runs in results.items():
+        times = [r['time'] for r in runs]
+        unsolved = sum(1 for r in runs if r['solution'] is None)
+        print(f"{backend:12s} mean {np.mean(times):.4f}s  median {np.median(times):.4f}s  "
+              f"max {np.max(times):.4f}s  unsolved {unsolved}/{len(runs)}")
+    return results
 
+# every a_star strategy on the same seeded puzzles (the 20-clue set by default),
+# to compare frontier sizes and latency; search_kwargs go to every run
+def compare_strategies(num_test=10, num_clues=20, seed=0, strategies=STRATEGIES, **search_kwargs):
+    puzzles = [seeded_puzzle(seed, num_clues, idx) for idx in range(num_test)]
+    results = {strategy: [run_a_star(puzzle, strategy=strategy, **search_kwargs) for puzzle in puzzles]
+               for strategy in strategies}
+    for strategy, runs in results.items():
+        solved = [r for r in runs if r.get('solution') is not None]
+        frontier = np.mean([r['max_frontier_size'] for r in solved]) if solved else float('nan')
+        expanded = np.mean([r['nodes_expanded'] for r in solved]) if solved else float('nan')
+        print(f"{strategy:10s} solved {len(solved)}/{len(runs)}  mean time {np.mean([r['time'] for r in runs]):.4f}s  "
+              f"mean expanded {expanded:.0f}  mean max frontier {frontier:.0f}")
+    return results
 
-def test_on_benchmark_web(url, num = None):
-    sudokus = get_sudokus_from_web(url)
-    results = {'a_star':[], 'sat':[]}
+RUNNERS = {'a_star': run_a_star, 'sat': run_sat, 'dlx': run_dlx}
+
+# the same (seed, num_clues, index, size) always gives the same puzzle, in any process
+def seeded_puzzle(seed, num_clues, index, size=9):
+    rng = random.Random(f"{seed}:{size}:{num_clues}:{index}")
+    return generate_random_sudoku_grid(size, int(size**0.5), num_clues, rng)
+
+
+# untimed SAT solve that builds the CNF template and the cached solver, otherwise
+# the ~0.1s build is charged to the first SAT record of a run
+def warm_sat(size=9):
+    solve_sudoku_sat(seeded_puzzle(0, size * size // 3, 0, size))
+
+
+# long-lived worker: runs warm() once, then (key, backend, make_puzzle) jobs from its
+# pipe until it gets None; results go back on the same pipe
+def _worker_loop(conn, warm):
+    if warm is not None:
+        warm()
+    while True:
+        job = conn.recv()
+        if job is None:
+            return
+        key, backend, make_puzzle = job
+        conn.send(RUNNERS[backend](make_puzzle()))
+
+
+# runs (key, backend, make_puzzle) jobs on a pool of `workers` long-lived processes and
+# yields (key, backend, metrics) as they finish; a job running longer than timeout
+# seconds is killed with its worker, reported as unsolved with status 'time_limit',
+# and only that worker is replaced. warm: optional callable every worker runs before
+# its first job (e.g. warm_sat; called in the parent first, forked workers inherit
+# what it built). Every worker has its own pipe, so killing one mid-write can't
+# corrupt the channel of the others
+def run_parallel(jobs, workers=None, timeout=None, warm=None):
+    workers = workers or os.cpu_count()
+    ctx = mp.get_context()
+    pending = list(reversed(jobs))
+    if warm is not None:
+        warm()
+
+    def spawn():
+        conn, child_conn = ctx.Pipe()
+        process = ctx.Process(target=_worker_loop, args=(child_conn, warm), daemon=True)
+        process.start()
+        child_conn.close()  # the worker holds the only other end, EOF if it dies
+        return process, conn
+
+    idle = [spawn() for _ in range(min(workers, len(pending)))]
+    busy = {}  # connection -> (process, key, backend, start time)
+    try:
+        while pending or busy:
+            while pending and idle:
+                process, conn = idle.pop()
+                key, backend, make_puzzle = job = pending.pop()
+                conn.send(job)
+                busy[conn] = (process, key, backend, time.time())
+
+            for conn in wait(list(busy), timeout=0.05):
+                process, key, backend, started = busy.pop(conn)
+                try:
+                    metrics = conn.recv()
+                    idle.append((process, conn))
+                except EOFError:  # crashed without reporting
+                    metrics = {'time': time.time() - started, 'solution': None, 'status': 'failed'}
+                    process.join()
+                    conn.close()
+                    idle.append(spawn())
+                yield key, backend, metrics
+
+            now = time.time()
+            for conn, (process, key, backend, started) in list(busy.items()):
+                if timeout is not None and now - started > timeout:
+                    process.terminate()
+                    process.join()
+                    conn.close()
+                    del busy[conn]
+                    idle.append(spawn())
+                    yield key, backend, {'time': now - started, 'solution': None, 'status': 'time_limit'}
+    finally:
+        for process, conn in idle:
+            conn.send(None)
+            conn.close()
+        for conn, (process, *_) in busy.items():  # generator closed early
+            process.terminate()
+            conn.close()
+        for process, _ in idle:
+            process.join()
+        for process, *_ in busy.values():
+            process.join()
+
+
+# parallel my_test: same results structure, puzzles are seeded per task so the A*
+# and SAT runs of one index share the grid and reruns are reproducible
+# results_path works as in my_test
+def my_test_parallel(num_test=NUM_TESTS, workers=None, seed=0, timeout=None, results_path=None):
+    results = {num_clues: {backend: [None] * num_test for backend in RUNNERS} for num_clues in CLUES_LIST}
+    done = completed_keys(results_path) if results_path else set()
+    jobs = [((num_clues, idx), backend, functools.partial(seeded_puzzle, seed, num_clues, idx))
+            for num_clues in CLUES_LIST for idx in range(num_test) for backend in RUNNERS
+            if (seed, 9, num_clues, idx, backend) not in done]
+    for (num_clues, idx), backend, metrics in run_parallel(jobs, workers, timeout, warm_sat):
+        if results_path:
+            append_result(results_path, seed, num_clues, idx, backend, metrics)
+        else:
+            results[num_clues][backend][idx] = metrics
+        print(f"Test completed for num_clues={num_clues}, iteration {idx}: {backend} time: {metrics['time']:.4f}s")
+    return results_path or results
+
+
+# source: URL of the online benchmark, or a local packed corpus / text file
+def test_on_benchmark_web(source, num = None, workers=None, timeout=None):
+    sudokus = load_sudokus(source, num)
+    results = {'a_star':[], 'sat':[], 'dlx':[]}
     num_clues_list = []
-    if num is not None:
-        sudokus = sudokus[:num]
 
+    if workers is not None:
+        results = {backend: [None] * len(sudokus) for backend in RUNNERS}
+        num_clues_list = [sum(1 for row in puzzle for cell in row if cell != 0) for puzzle in sudokus]
+        jobs = [(idx, backend, functools.partial(list, puzzle)) for idx, puzzle in enumerate(sudokus) for backend in RUNNERS]
+        warm = functools.partial(warm_sat, len(sudokus[0])) if sudokus else None
+        for idx, backend, metrics in run_parallel(jobs, workers, timeout, warm):
+            metrics['num_clues'] = num_clues_list[idx]
+            results[backend][idx] = metrics
+        return results, num_clues_list
+
+    if sudokus:
+        warm_sat(len(sudokus[0]))
     for idx, puzzle in enumerate(sudokus):
         print(f"Testing puzzle {idx+1}/{len(sudokus)} from benchmark...")
         # get clues number
@@ -111,30 +443,52 @@ def test_on_benchmark_web(url, num = None):
         sat_metrics['num_clues'] = num_clues
         results['sat'].append(sat_metrics)
 
+        # DLX
+        dlx_metrics = run_dlx(puzzle)
+        dlx_metrics['num_clues'] = num_clues
+        results['dlx'].append(dlx_metrics)
+
     return results, num_clues_list
 
 
-def plot_metric(metric_name, title, filename, results, folder):
+# x values and label of the plots: number of clues (my_test) or board size (my_test_sizes)
+def sweep_axis(group):
+    if group == 'size':
+        return SIZES_LIST, "Board size"
+    return CLUES_LIST, "Number of clues"
+
+# results: the in-memory results dict or the path of a results file (streamed)
+# group: 'num_clues', or 'size' for the results of my_test_sizes
+def plot_metric(metric_name, title, filename, results, folder, group='num_clues'):
     plt.figure(figsize=(8,6))
+    xs, xlabel = sweep_axis(group)
+    agg = aggregate_results(results, [metric_name], group)
     means_a = []
     stds_a = []
     means_s = []
     stds_s = []
+    means_d = []
+    stds_d = []
     
-    for num_clues in CLUES_LIST:
-        a_values = [r[metric_name] for r in results[num_clues]['a_star'] if r.get(metric_name) is not None]
-        s_values = [r[metric_name] for r in results[num_clues]['sat'] if r.get(metric_name) is not None]
-        means_a.append(np.mean(a_values))
-        stds_a.append(np.std(a_values))
-        means_s.append(np.mean(s_values))
-        stds_s.append(np.std(s_values))
+    for num_clues in xs:
+        mean, std = metric_stats(agg, num_clues, 'a_star', metric_name)
+        means_a.append(mean)
+        stds_a.append(std)
+        mean, std = metric_stats(agg, num_clues, 'sat', metric_name)
+        means_s.append(mean)
+        stds_s.append(std)
+        mean, std = metric_stats(agg, num_clues, 'dlx', metric_name)
+        means_d.append(mean)
+        stds_d.append(std)
 
     if any(~np.isnan(means_a)):
-        plt.errorbar(CLUES_LIST, means_a, yerr=stds_a, label='A*', marker='o', capsize=5, color='blue')
+        plt.errorbar(xs, means_a, yerr=stds_a, label='A*', marker='o', capsize=5, color='blue')
     if any(~np.isnan(means_s)):
-        plt.errorbar(CLUES_LIST, means_s, yerr=stds_s, label='SAT', marker='s', capsize=5, color='orange')
+        plt.errorbar(xs, means_s, yerr=stds_s, label='SAT', marker='s', capsize=5, color='orange')
+    if any(~np.isnan(means_d)):
+        plt.errorbar(xs, means_d, yerr=stds_d, label='DLX', marker='^', capsize=5, color='green')
 
-    plt.xlabel("Number of clues")
+    plt.xlabel(xlabel)
     plt.ylabel(metric_name)
     plt.title(title)
     plt.legend()
@@ -143,31 +497,65 @@ def plot_metric(metric_name, title, filename, results, folder):
     plt.savefig(os.path.join(folder, filename))
     plt.close()
 
-def plot_unsolved_counts(results, filename="unsolved.png", folder="results"):
-    unsolved_astar = []
-    unsolved_sat = []
+# checks every returned solution in one vectorized pass per algorithm, marks each
+# run with 'valid' and prints solved / valid counts per number of clues
+# (a results file is loaded in full for this)
+def summarize_solutions(results, group='num_clues'):
+    if isinstance(results, str):
+        results = load_results(results, group)
+    summary = {}
+    for num_clues, algos in results.items():
+        for backend, runs in algos.items():
+            solved = [r for r in runs if r is not None and r.get('solution') is not None]
+            valid = validate_grids([r['solution'] for r in solved]) if solved else []
+            for r, ok in zip(solved, valid):
+                r['valid'] = bool(ok)
+            summary[num_clues, backend] = {'runs': len(runs), 'solved': len(solved), 'valid': int(np.sum(valid))}
+            print(f"{group}={num_clues} {backend}: {len(solved)}/{len(runs)} solved, {int(np.sum(valid))} valid")
+    return summary
+
+# unsolved runs split per algorithm: the hatched part of each bar stopped on a
+# budget (time, memory, iterations, conflicts), the rest failed outright
+def plot_unsolved_counts(results, filename="unsolved.png", folder="results", group='num_clues'):
+    xs, xlabel = sweep_axis(group)
+    agg = aggregate_results(results, [], group)
+    empty = {'unsolved': 0, 'budget': 0}
+    failed_astar, budget_astar = [], []
+    failed_sat, budget_sat = [], []
+    failed_dlx, budget_dlx = [], []
 
     
-    for num_clues in CLUES_LIST:
+    for num_clues in xs:
         # A* non risolti
-        count_astar = sum(1 for r in results[num_clues]['a_star'] if r.get('solution') is None)
-        unsolved_astar.append(count_astar)
+        counts = agg.get(num_clues, {}).get('a_star', empty)
+        budget_astar.append(counts['budget'])
+        failed_astar.append(counts['unsolved'] - counts['budget'])
 
         # SAT non risolti
-        count_sat = sum(1 for r in results[num_clues]['sat'] if r.get('solution') is None)
-        unsolved_sat.append(count_sat)
+        counts = agg.get(num_clues, {}).get('sat', empty)
+        budget_sat.append(counts['budget'])
+        failed_sat.append(counts['unsolved'] - counts['budget'])
 
-    x = np.arange(len(CLUES_LIST))
-    width = 0.35
+        # DLX non risolti
+        counts = agg.get(num_clues, {}).get('dlx', empty)
+        budget_dlx.append(counts['budget'])
+        failed_dlx.append(counts['unsolved'] - counts['budget'])
 
-    plt.figure(figsize=(8, 6))
-    plt.bar(x - width/2, unsolved_astar, width, label='A*')
-    plt.bar(x + width/2, unsolved_sat, width, label='SAT')
+    x = np.arange(len(xs))
+    width = 0.25
 
-    plt.xticks(x, CLUES_LIST)
-    plt.xlabel("Number of clues")
+    plt.figure(figsize=(8, 6))
+    plt.bar(x - width, failed_astar, width, label='A* failed', color='C0')
+    plt.bar(x - width, budget_astar, width, bottom=failed_astar, label='A* budget exceeded', color='C0', alpha=0.5, hatch='//')
+    plt.bar(x, failed_sat, width, label='SAT failed', color='C1')
+    plt.bar(x, budget_sat, width, bottom=failed_sat, label='SAT budget exceeded', color='C1', alpha=0.5, hatch='//')
+    plt.bar(x + width, failed_dlx, width, label='DLX failed', color='C2')
+    plt.bar(x + width, budget_dlx, width, bottom=failed_dlx, label='DLX budget exceeded', color='C2', alpha=0.5, hatch='//')
+
+    plt.xticks(x, xs)
+    plt.xlabel(xlabel)
     plt.ylabel("Unsolved puzzles (out of {})".format(NUM_TESTS))
-    plt.title("Unsolved puzzles vs number of clues")
+    plt.title("Unsolved puzzles vs {}".format(xlabel.lower()))
     plt.legend()
     plt.grid(axis='y', linestyle='--', alpha=0.6)
 
@@ -178,7 +566,7 @@ def plot_unsolved_counts(results, filename="unsolved.png", folder="results"):
 import csv
 import numpy as np
 
-def save_summary_table(results, filename="summary_table.csv", folder="results"):
+def save_summary_table(results, filename="summary_table.csv", folder="results", group='num_clues'):
     """
     Save a summary table of metrics to a CSV file.
       - mean
@@ -188,58 +576,82 @@ def save_summary_table(results, filename="summary_table.csv", folder="results"):
     """
     metrics_astar = ['time', 'steps', 'nodes_generated', 'max_frontier_size']
     metrics_sat = ['time', 'clauses', 'variables', 'clause_to_var_ratio']
+    metrics_dlx = ['time', 'dlx_nodes', 'dlx_updates']
 
     with open(os.path.join(folder, filename), mode='w', newline='') as f:
         writer = csv.writer(f)
         # Header
-        header = ['Algorithm', 'Num_clues', 'Metric', 'Mean', 'Std', 'Solved', 'Unsolved']
+        header = ['Algorithm', 'Size' if group == 'size' else 'Num_clues', 'Metric', 'Mean', 'Std', 'Solved', 'Unsolved']
         writer.writerow(header)
 
-        for num_clues, algos in results.items():
+        agg = aggregate_results(results, sorted(set(metrics_astar + metrics_sat + metrics_dlx)), group)
+        for num_clues, algos in agg.items():
             # A* metrics
             for metric in metrics_astar:
-                values = [r[metric] for r in algos['a_star'] if r.get(metric) is not None]
-                solved = sum(1 for r in algos['a_star'] if r.get('solution') is not None)
-                unsolved = sum(1 for r in algos['a_star'] if r.get('solution') is None)
-                mean_val = np.mean(values) if values else None
-                std_val = np.std(values) if values else None
+                mean_val, std_val = metric_stats(agg, num_clues, 'a_star', metric, missing=None)
+                solved = algos.get('a_star', {}).get('solved', 0)
+                unsolved = algos.get('a_star', {}).get('unsolved', 0)
                 writer.writerow(['A*', num_clues, metric, mean_val, std_val, solved, unsolved])
 
             # SAT metrics
             for metric in metrics_sat:
-                values = [r[metric] for r in algos['sat'] if r.get(metric) is not None]
-                solved = sum(1 for r in algos['sat'] if r.get('solution') is not None)
-                unsolved = sum(1 for r in algos['sat'] if r.get('solution') is None)
-                mean_val = np.mean(values) if values else None
-                std_val = np.std(values) if values else None
+                mean_val, std_val = metric_stats(agg, num_clues, 'sat', metric, missing=None)
+                solved = algos.get('sat', {}).get('solved', 0)
+                unsolved = algos.get('sat', {}).get('unsolved', 0)
                 writer.writerow(['SAT', num_clues, metric, mean_val, std_val, solved, unsolved])
 
+            # DLX metrics
+            for metric in metrics_dlx:
+                mean_val, std_val = metric_stats(agg, num_clues, 'dlx', metric, missing=None)
+                solved = algos.get('dlx', {}).get('solved', 0)
+                unsolved = algos.get('dlx', {}).get('unsolved', 0)
+                writer.writerow(['DLX', num_clues, metric, mean_val, std_val, solved, unsolved])
+
     print(f"Summary table saved to {filename}")
 
 
-results = my_test(num_test=50)
-folder="my_results"
+if __name__ == "__main__":
+    folder="my_results"
+    os.makedirs(folder, exist_ok=True)
+    # runs are streamed to results.jsonl, rerunning after a crash resumes from it
+    results = my_test(num_test=50, seed=0, results_path=os.path.join(folder, "results.jsonl"))
+    #results = my_test_parallel(num_test=50, workers=4, seed=0, timeout=60, results_path=os.path.join(folder, "results.jsonl"))
+
+    #results = test_on_benchmark_web("http://magictour.free.fr/top2365", 100)
+    #results = test_on_benchmark_web("top2365.sdk", 100)  # offline, see corpus.import_text
+    #folder="results_benchmark"
+
+    os.makedirs(folder, exist_ok=True)
+    # Metriche da plottare
+    plot_metric('time', 'Execution time vs number of clues', 'time.png', results, folder)
+    plot_metric('steps', 'A* steps vs number of clues', 'steps.png', results, folder)
+    plot_metric('nodes_generated', 'A* nodes generated vs number of clues', 'nodes_generated.png', results, folder)
+    plot_metric('max_frontier_size', 'A* max frontier size vs number of clues', 'max_frontier_size.png', results, folder)
+
+    # Metriche SAT
+    plot_metric('clauses', 'SAT clauses vs number of clues', 'sat_clauses.png', results, folder)
+    plot_metric('variables', 'SAT number of variables vs number of clues', 'sat_variables.png', results, folder)
+    plot_metric('clause_to_var_ratio', 'SAT clause-to-variable ratio vs number of clues', 'sat_clause_to_var_ratio.png', results, folder)
 
-#results = test_on_benchmark_web("http://magictour.free.fr/top2365", 100)
-#folder="results_benchmark"
+    # Metriche DLX
+    plot_metric('dlx_updates', 'DLX link updates vs number of clues', 'dlx_updates.png', results, folder)
 
-os.makedirs(folder, exist_ok=True)
-# Metriche da plottare
-plot_metric('time', 'Execution time vs number of clues', 'time.png', results, folder)
-plot_metric('steps', 'A* steps vs number of clues', 'steps.png', results, folder)
-plot_metric('nodes_generated', 'A* nodes generated vs number of clues', 'nodes_generated.png', results, folder)
-plot_metric('max_frontier_size', 'A* max frontier size vs number of clues', 'max_frontier_size.png', results, folder)
+    plot_unsolved_counts(results, "unsolved.png", folder)
 
-# Metriche SAT
-plot_metric('clauses', 'SAT clauses vs number of clues', 'sat_clauses.png', results, folder)
-plot_metric('variables', 'SAT number of variables vs number of clues', 'sat_variables.png', results, folder)
-plot_metric('clause_to_var_ratio', 'SAT clause-to-variable ratio vs number of clues', 'sat_clause_to_var_ratio.png', results, folder)
+    summarize_solutions(results)
 
-plot_unsolved_counts(results, "unsolved.png", folder)
+    save_summary_table(results, "summary_table.csv", folder)
 
-save_summary_table(results, "summary_table.csv", folder)
+    # a_star strategies on the 20-clue set
+    #compare_strategies(num_test=20, num_clues=20, time_limit=30)
 
-print("All tests done. Plots saved in 'results/' folder.")
+    # SAT backends on the same puzzles (e.g. a hard benchmark set)
+    #compare_sat_backends(load_sudokus("top2365.sdk", 100), portfolio=True)
 
+    # scaling with the board size (9x9, 16x16, 25x25)
+    #results = my_test_sizes(num_test=10, seed=0, results_path=os.path.join(folder, "sizes.jsonl"))
+    #plot_metric('time', 'Execution time vs board size', 'time_size.png', results, folder, group='size')
+    #plot_unsolved_counts(results, "unsolved_size.png", folder, group='size')
+    #save_summary_table(results, "summary_table_size.csv", folder, group='size')
 
-print(results)
+    print("All tests done. Plots saved in 'results/' folder.")